@@ -4,6 +4,7 @@ B3 Trading Platform - Execution Engine
 API principal para backtesting, paper trading e execução.
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
@@ -495,7 +496,7 @@ async def get_signal(
     
     # Gerar sinal
     manager = StrategyManager()
-    signal = await manager.generate_signal(strategy, data)
+    signal = await manager.generate_signal(strategy, data, realtime=True)
     
     return SignalResponse(
         symbol=symbol,
@@ -514,15 +515,20 @@ async def scan_signals(
     symbol_list = [s.strip() for s in symbols.split(",")]
     results = []
     
-    for symbol in symbol_list:
-        try:
-            signal = await get_signal(symbol, timeframe, strategy)
-            results.append(signal.model_dump())
-        except Exception as e:
+    # Símbolos processados concorrentemente (consulta + cálculo em thread)
+    signals = await asyncio.gather(
+        *(get_signal(symbol, timeframe, strategy) for symbol in symbol_list),
+        return_exceptions=True
+    )
+    
+    for symbol, signal in zip(symbol_list, signals):
+        if isinstance(signal, Exception):
             results.append({
                 "symbol": symbol,
-                "error": str(e)
+                "error": str(signal)
             })
+        else:
+            results.append(signal.model_dump())
     
     return {
         "scan_time": datetime.now(),
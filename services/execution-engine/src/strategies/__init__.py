@@ -20,6 +20,7 @@ Uso:
 """
 
 from .base_strategy import BaseStrategy, Signal
+from .indicator_cache import IndicatorCache
 from .trend_following import TrendFollowingStrategy
 from .mean_reversion import MeanReversionStrategy
 from .breakout import BreakoutStrategy
@@ -32,6 +33,7 @@ __all__ = [
     # Base
     'BaseStrategy',
     'Signal',
+    'IndicatorCache',
     
     # Estratégias
     'TrendFollowingStrategy',
@@ -0,0 +1,313 @@
+"""
+B3 Trading Platform - Indicator Kernels
+=========================================
+Kernels numéricos usados pelos helpers de indicadores de `base_strategy`.
+
+Trabalham diretamente sobre arrays NumPy float64 (uma coluna por argumento),
+sem montar Series/DataFrames intermediários, para que o caminho quente de
+`calculate_indicators` não pague alocações e dispatch do pandas.
+
+As janelas móveis usam, nesta ordem, os kernels Numba de `_numba` (mesmo
+algoritmo do pandas, resultado idêntico), o bottleneck e o pandas.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+from . import _numba
+
+
+def _asc(values: np.ndarray) -> np.ndarray:
+    """
+    Garante um array 1-D float64 contíguo em ordem C.
+
+    Colunas vindas de fatias (`df.iloc[::k]`) ou de blocos montados aos
+    poucos podem chegar com stride; os kernels Numba e as ufuncs vetorizam
+    melhor sobre memória contígua. Não copia quando o array já está assim.
+    """
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def true_range(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calcula o True Range com operações in-place.
+
+    TR = max(high - low, |high - close[t-1]|, |low - close[t-1]|)
+
+    No primeiro candle não existe fechamento anterior e o TR se reduz a
+    high - low, a mesma semântica do antigo `pd.concat([...], axis=1).max(axis=1)`
+    (`np.fmax` também ignora NaN como o `max` do pandas).
+
+    O resultado é escrito em `out` (alocado se None). Com Numba é um único
+    loop compilado; sem ele, os dois termos com o fechamento anterior
+    reutilizam um único buffer temporário.
+    """
+    high, low, close = _asc(high), _asc(low), _asc(close)
+    if out is None:
+        out = np.empty_like(close)
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.true_range(high, low, close, out)
+    
+    np.subtract(high, low, out=out)
+
+    if len(close) > 1:
+        gap = np.subtract(high[1:], close[:-1])
+        np.fmax(out[1:], np.abs(gap, out=gap), out=out[1:])
+        np.subtract(low[1:], close[:-1], out=gap)
+        np.fmax(out[1:], np.abs(gap, out=gap), out=out[1:])
+
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Média móvel simples com janela completa (NaN nos primeiros window-1)."""
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.rolling_mean(_asc(values), window)
+    return pd.Series(values).rolling(window=window).mean().to_numpy()
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Desvio padrão amostral (ddof=1) móvel com janela completa."""
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.rolling_std(_asc(values), window)
+    return pd.Series(values).rolling(window=window).std().to_numpy()
+
+
+def bollinger(values: np.ndarray, window: int, num_std: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bandas de Bollinger (superior, média, inferior) com desvio amostral.
+
+    Com Numba, média e desvio saem de uma única passada sobre `values`.
+    """
+    values = _asc(values)
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.bollinger(values, window, float(num_std))
+    
+    middle = rolling_mean(values, window)
+    std = rolling_std(values, window)
+    return middle + std * num_std, middle, middle - std * num_std
+
+
+def volume_sma(volume: np.ndarray, window: int) -> np.ndarray:
+    """
+    Média móvel do volume com janela completa.
+
+    Volumes inteiros (o caso normal) usam a soma cumulativa int64: cada
+    soma de janela é `cs[i] - cs[i - window]`, exata, e a média sai de uma
+    única divisão, como no pandas. São duas ufuncs, sem loop por janela.
+
+    Volumes float (com NaN, por exemplo) seguem o kernel Numba compensado ou,
+    sem ele, o bottleneck `move_mean`, um único loop C de soma corrente que
+    difere de `rolling(window).mean()` no máximo pelo arredondamento final.
+    Não é usado para preços/RSI, em que a soma corrente sem compensação
+    deixaria resíduos em janelas planas.
+    """
+    if volume.dtype.kind in 'iu' and window >= 1:
+        out = np.full(len(volume), np.nan)
+        if len(volume) >= window:
+            cs = np.empty(len(volume) + 1, dtype=np.int64)
+            cs[0] = 0
+            np.cumsum(volume, dtype=np.int64, out=cs[1:])
+            np.divide(cs[window:] - cs[:-window], window, out=out[window - 1:])
+        return out
+    if _numba.NUMBA_AVAILABLE:
+        return rolling_mean(volume, window)
+    if BOTTLENECK_AVAILABLE and len(volume) >= window:
+        return bn.move_mean(_asc(volume), window=window, min_count=window)
+    return rolling_mean(volume, window)
+
+
+def _sliding_extreme(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    """
+    Máxima/mínima móvel via `sliding_window_view` (fallback sem Numba).
+
+    Uma única redução C sobre a visão 2D das janelas, sem cópia dos dados;
+    NaN em uma janela propaga para o resultado, como no pandas com janela
+    completa.
+    """
+    values = _asc(values)
+    out = np.full(len(values), np.nan)
+    if 1 <= window <= len(values):
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        reduce(windows, axis=1, out=out[window - 1:])
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Máxima móvel com janela completa (NaN nos primeiros window-1).
+
+    Ordem de preferência: kernel Numba (deque monotônica, O(N)), bottleneck
+    `move_max` (também O(N); `min_count=window` reproduz a semântica de
+    `rolling(window).max()` do pandas) e, por fim, `sliding_window_view`,
+    O(N·janela) mas sem objetos do pandas por janela.
+    """
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.rolling_max(_asc(values), window)
+    if BOTTLENECK_AVAILABLE and len(values) >= window:
+        return bn.move_max(_asc(values), window=window, min_count=window)
+    return _sliding_extreme(values, window, np.max)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Mínima móvel com janela completa (ver `rolling_max`)."""
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.rolling_min(_asc(values), window)
+    if BOTTLENECK_AVAILABLE and len(values) >= window:
+        return bn.move_min(_asc(values), window=window, min_count=window)
+    return _sliding_extreme(values, window, np.min)
+
+
+def _ewm_alpha(period: int) -> float:
+    """
+    Alpha de `ewm(span=period)`, 2 / (period + 1).
+
+    Derivado do centro de massa como no pandas, para que os kernels Numba
+    reproduzam `ewm(span=period, adjust=False).mean()` bit a bit.
+    """
+    return 1.0 / (1.0 + (period - 1) / 2.0)
+
+
+def _wilder_alpha(period: int) -> float:
+    """
+    Alpha da suavização de Wilder, `ewm(alpha=1/period)`.
+
+    Passa pelo centro de massa ((1 - alpha) / alpha) como o pandas, pelo
+    mesmo motivo de `_ewm_alpha`.
+    """
+    alpha = 1.0 / period
+    return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Suavização de Wilder: `ewm(alpha=1/period, adjust=False, min_periods=period)`.
+
+    Recorrência O(N) usada pelo ATR e pelo RSI; NaN até `period` observações.
+    """
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.ewm_mean(_asc(values), _wilder_alpha(period), period)
+    return pd.Series(values).ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean().to_numpy()
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Média móvel exponencial com `alpha = 2 / (period + 1)` e `adjust=False`."""
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.ewm_mean(_asc(values), _ewm_alpha(period))
+    return pd.Series(values).ewm(span=period, adjust=False).mean().to_numpy()
+
+
+def macd(values: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD: (linha MACD, linha de sinal, histograma).
+
+    Com Numba, as três EMAs e as diferenças rodam em uma única chamada
+    compilada.
+    """
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.macd(_asc(values), _ewm_alpha(fast), _ewm_alpha(slow), _ewm_alpha(signal))
+    
+    return macd_from_emas(ema(values, fast), ema(values, slow), signal)
+
+
+def macd_from_emas(ema_fast: np.ndarray, ema_slow: np.ndarray, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD a partir das EMAs rápida e lenta já calculadas.
+
+    Para quem já precisa das duas EMAs: só a linha de sinal é calculada, com
+    os mesmos resultados de `macd`.
+    """
+    macd_line = np.asarray(ema_fast, dtype=np.float64) - np.asarray(ema_slow, dtype=np.float64)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    """
+    Maior drawdown (valor <= 0) da curva de patrimônio `cumprod(1 + r)`.
+
+    Com Numba é um único loop acumulador; sem ele, cumprod + máximo
+    acumulado do NumPy. NaN em `returns` conta como retorno 0.
+    """
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.max_drawdown(_asc(returns))
+    
+    cumulative = np.cumprod(1.0 + np.nan_to_num(returns, nan=0.0))
+    if len(cumulative) == 0:
+        return 0.0
+    peak = np.maximum(np.maximum.accumulate(cumulative), 1.0)
+    with np.errstate(invalid='ignore'):
+        return min(float(np.min((cumulative - peak) / peak)), 0.0)
+
+
+def crossed_above(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """
+    Máscara booleana dos candles em que `fast` cruza `slow` para cima.
+
+    Compara o candle atual com o anterior por fatiamento (`[1:]` vs `[:-1]`),
+    sem o `.shift(1)` que aloca uma Series com NaN. O primeiro candle nunca é
+    cruzamento e comparações com NaN dão False, como no `.shift`.
+    """
+    out = np.zeros(len(fast), dtype=bool)
+    out[1:] = (fast[1:] > slow[1:]) & (fast[:-1] <= slow[:-1])
+    return out
+
+
+def crossed_below(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """Máscara booleana dos candles em que `fast` cruza `slow` para baixo."""
+    out = np.zeros(len(fast), dtype=bool)
+    out[1:] = (fast[1:] < slow[1:]) & (fast[:-1] >= slow[:-1])
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Average True Range: suavização de Wilder do True Range."""
+    if _numba.NUMBA_AVAILABLE:
+        return _numba.atr(_asc(high), _asc(low), _asc(close), period, _wilder_alpha(period))
+    return wilder(true_range(high, low, close), period)
+
+
+def rsi(close: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Relative Strength Index com suavização de Wilder de ganhos e perdas.
+
+    Usa a forma RSI = 100 * ganho / (ganho + perda), equivalente a
+    100 - 100 / (1 + RS), com divisão protegida: médias sem perdas dão 100
+    sem passar por RS infinito, e médias sem variação ficam NaN, sem emitir
+    avisos de divisão por zero.
+
+    O resultado é escrito em `out` (alocado se None). Com Numba, diferenças,
+    médias e divisão rodam em um único kernel compilado; sem ele, os
+    intermediários são reaproveitados in-place.
+    """
+    close = _asc(close)
+    if _numba.NUMBA_AVAILABLE:
+        out = np.empty_like(close) if out is None else out
+        return _numba.rsi(close, period, _wilder_alpha(period), out)
+    
+    delta = np.empty_like(close)
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+
+    # maximum(x, 0) zera negativos e preserva o NaN, como `clip(lower=0)`
+    gain = wilder(np.maximum(delta, 0.0), period)
+    loss = wilder(np.maximum(np.negative(delta, out=delta), 0.0), period)
+
+    total = np.add(gain, loss, out=loss)
+    if out is None:
+        out = np.empty_like(total)
+    out.fill(np.nan)
+    return np.divide(np.multiply(gain, 100.0, out=gain), total, out=out, where=total != 0)
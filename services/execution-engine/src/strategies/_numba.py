@@ -0,0 +1,692 @@
+"""
+B3 Trading Platform - Numba Kernels
+=====================================
+Kernels de janela móvel compilados com Numba (opcional).
+
+Reproduzem os algoritmos das janelas fixas do pandas (`rolling(window)` com
+janela completa) em um único loop compilado, sem a construção de objetos do
+pandas a cada chamada:
+
+- média: soma corrente com compensação de Kahan, inclusive o tratamento de
+  valores repetidos e de sinal do pandas, então o resultado é idêntico;
+- desvio padrão: Welford com Kahan (mesmo algoritmo do `roll_var`);
+- máxima/mínima: deque monotônica, O(N) independente da janela.
+
+Sem `fastmath`: a reassociação de operações anularia a compensação de Kahan.
+Todos os kernels usam `nogil=True`, então `BaseStrategy.run_many` processa
+várias séries em paralelo com threads.
+
+Se o Numba não estiver instalado, `NUMBA_AVAILABLE` é False e `_indicators`
+usa os caminhos NumPy/pandas; as funções continuam definidas (como Python
+puro) apenas para manter a importação válida.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Decorador identidade quando o Numba não está disponível."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean(values, window):
+    """Média móvel com janela completa (NaN se a janela tiver algum NaN)."""
+    n = len(values)
+    out = np.empty(n)
+    if window < 1:
+        # Janela vazia: o pandas devolve tudo NaN
+        out[:] = np.nan
+        return out
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_ct = 0
+    prev_value = values[0] if n > 0 else np.nan
+
+    for i in range(n):
+        if window == 1:
+            # Janela unitária: cada candle é uma nova janela
+            nobs = 0
+            neg_ct = 0
+            sum_x = 0.0
+            comp_add = 0.0
+            comp_remove = 0.0
+            same_ct = 0
+            prev_value = values[i]
+        elif i >= window:
+            # Remove o valor que saiu da janela
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1
+
+        # Adiciona o valor que entrou na janela
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+
+        if nobs >= window:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_std(values, window):
+    """Desvio padrão amostral (ddof=1) móvel com janela completa."""
+    n = len(values)
+    out = np.empty(n)
+    if window < 1:
+        # Janela vazia: o pandas devolve tudo NaN
+        out[:] = np.nan
+        return out
+    nobs = 0.0
+    mean_x = 0.0
+    ssqdm_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_ct = 0
+    prev_value = values[0] if n > 0 else np.nan
+
+    for i in range(n):
+        if window == 1:
+            nobs = 0.0
+            mean_x = 0.0
+            ssqdm_x = 0.0
+            comp_add = 0.0
+            comp_remove = 0.0
+            same_ct = 0
+            prev_value = values[i]
+        elif i >= window:
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean_x - comp_remove
+                    y = val - comp_remove
+                    t = y - mean_x
+                    comp_remove = t + mean_x - y
+                    mean_x = mean_x - t / nobs
+                    ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                else:
+                    mean_x = 0.0
+                    ssqdm_x = 0.0
+
+        val = values[i]
+        if val == val:
+            nobs += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+            prev_mean = mean_x - comp_add
+            y = val - comp_add
+            t = y - mean_x
+            comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+        if nobs >= window and nobs > 1:
+            if same_ct >= nobs:
+                out[i] = 0.0
+            else:
+                var = ssqdm_x / (nobs - 1.0)
+                out[i] = np.sqrt(var) if var >= 0 else 0.0
+        else:
+            out[i] = np.nan
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rolling_extreme(values, window, is_max):
+    """Máxima/mínima móvel via deque monotônica de índices."""
+    n = len(values)
+    out = np.empty(n)
+    if window < 1:
+        # Janela vazia: o pandas devolve tudo NaN
+        out[:] = np.nan
+        return out
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nan_ct = 0
+
+    for i in range(n):
+        val = values[i]
+        if val != val:
+            nan_ct += 1
+        else:
+            # Descarta candidatos dominados pelo novo valor
+            if is_max:
+                while tail > head and val >= values[queue[tail - 1]]:
+                    tail -= 1
+            else:
+                while tail > head and val <= values[queue[tail - 1]]:
+                    tail -= 1
+            queue[tail] = i
+            tail += 1
+
+        if i >= window:
+            if values[i - window] != values[i - window]:
+                nan_ct -= 1
+        # Descarta índices que saíram da janela
+        while tail > head and queue[head] <= i - window:
+            head += 1
+
+        if i >= window - 1 and nan_ct == 0:
+            out[i] = values[queue[head]]
+        else:
+            out[i] = np.nan
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_max(values, window):
+    """Máxima móvel com janela completa."""
+    return _rolling_extreme(values, window, True)
+
+
+@njit(cache=True, nogil=True)
+def rolling_min(values, window):
+    """Mínima móvel com janela completa."""
+    return _rolling_extreme(values, window, False)
+
+
+@njit(cache=True, nogil=True)
+def ewm_mean(values, alpha, min_periods=0):
+    """
+    Média exponencial recursiva (`ewm(adjust=False, min_periods=...).mean()`).
+
+    y[i] = (1 - alpha) * y[i-1] + alpha * x[i], começando no primeiro valor
+    válido. NaN no meio da série mantém o último valor e decai o peso antigo,
+    como o pandas com `ignore_na=False`. Fica NaN enquanto houver menos de
+    `min_periods` observações válidas.
+    """
+    n = len(values)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0]
+    old_wt = 1.0
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= min_periods else np.nan
+
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                # Evita erro numérico em séries constantes
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def max_drawdown(returns):
+    """
+    Maior drawdown (valor <= 0) do patrimônio acumulado em uma passada.
+
+    Acumula (1 + r) e o pico corrente sem arrays intermediários; NaN conta
+    como retorno 0.
+    """
+    cumulative = 1.0
+    peak = 1.0
+    worst = 0.0
+
+    for i in range(len(returns)):
+        r = returns[i]
+        if r == r:
+            cumulative *= 1.0 + r
+        if cumulative > peak:
+            peak = cumulative
+        drawdown = (cumulative - peak) / peak
+        if drawdown < worst:
+            worst = drawdown
+
+    return worst
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _fmax(a, b):
+    """Mesma semântica do `np.fmax`: NaN é ignorado se o outro valor existe."""
+    return a if (a >= b or b != b) else b
+
+
+@njit(cache=True, nogil=True)
+def true_range(high, low, close, out):
+    """True Range em `out`; no primeiro candle reduz-se a high - low."""
+    n = len(close)
+    if n > 0:
+        out[0] = high[0] - low[0]
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        tr = _fmax(high[i] - low[i], abs(high[i] - prev_close))
+        out[i] = _fmax(tr, abs(low[i] - prev_close))
+    return out
+
+
+@njit(cache=True, nogil=True)
+def atr(high, low, close, period, alpha):
+    """Average True Range: média de Wilder (`alpha` = 1/period) do True Range."""
+    tr = true_range(high, low, close, np.empty(len(close)))
+    return ewm_mean(tr, alpha, period)
+
+
+@njit(cache=True, nogil=True)
+def rsi(close, period, alpha, out):
+    """
+    RSI com médias de Wilder (`alpha` = 1/period) de ganhos e perdas em `out`.
+
+    100 * ganho / (ganho + perda); NaN quando ganho e perda médios são zero.
+    A primeira diferença não existe (NaN), então o primeiro valor válido é
+    o do candle `period`, como no pandas com `close.diff()`.
+    """
+    n = len(close)
+    gain = np.empty(n)
+    loss = np.empty(n)
+    for i in range(n):
+        delta = close[i] - close[i - 1] if i > 0 else np.nan
+        if delta != delta:
+            gain[i] = np.nan
+            loss[i] = np.nan
+        else:
+            gain[i] = max(delta, 0.0)
+            loss[i] = max(-delta, 0.0)
+
+    gain = ewm_mean(gain, alpha, period)
+    loss = ewm_mean(loss, alpha, period)
+
+    for i in range(n):
+        total = gain[i] + loss[i]
+        out[i] = gain[i] * 100.0 / total if total != 0 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd(close, fast_alpha, slow_alpha, signal_alpha):
+    """Linha MACD, linha de sinal e histograma a partir das três EMAs."""
+    macd_line = ewm_mean(close, fast_alpha) - ewm_mean(close, slow_alpha)
+    signal_line = ewm_mean(macd_line, signal_alpha)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True, nogil=True)
+def bollinger(values, window, num_std):
+    """
+    Bandas de Bollinger (superior, média, inferior) em uma única passada.
+
+    Funde `rolling_mean` e `rolling_std`: cada valor que entra ou sai da
+    janela atualiza a soma de Kahan da média e o estado de Welford da
+    variância no mesmo loop, com os mesmos resultados dos kernels separados.
+    """
+    n = len(values)
+    upper = np.empty(n)
+    middle = np.empty(n)
+    lower = np.empty(n)
+    if window < 1:
+        upper[:] = np.nan
+        middle[:] = np.nan
+        lower[:] = np.nan
+        return upper, middle, lower
+
+    nobs = 0
+    neg_ct = 0
+    same_ct = 0
+    prev_value = values[0] if n > 0 else np.nan
+    # Estado da média (soma de Kahan)
+    sum_x = 0.0
+    sum_comp_add = 0.0
+    sum_comp_remove = 0.0
+    # Estado da variância (Welford com Kahan)
+    mean_x = 0.0
+    ssqdm_x = 0.0
+    var_comp_add = 0.0
+    var_comp_remove = 0.0
+
+    for i in range(n):
+        if window == 1:
+            nobs = 0
+            neg_ct = 0
+            same_ct = 0
+            prev_value = values[i]
+            sum_x = 0.0
+            sum_comp_add = 0.0
+            sum_comp_remove = 0.0
+            mean_x = 0.0
+            ssqdm_x = 0.0
+            var_comp_add = 0.0
+            var_comp_remove = 0.0
+        elif i >= window:
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - sum_comp_remove
+                t = sum_x + y
+                sum_comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct -= 1
+                if nobs:
+                    prev_mean = mean_x - var_comp_remove
+                    y = val - var_comp_remove
+                    t = y - mean_x
+                    var_comp_remove = t + mean_x - y
+                    mean_x = mean_x - t / nobs
+                    ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                else:
+                    mean_x = 0.0
+                    ssqdm_x = 0.0
+
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - sum_comp_add
+            t = sum_x + y
+            sum_comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(val):
+                neg_ct += 1
+            if val == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = val
+            prev_mean = mean_x - var_comp_add
+            y = val - var_comp_add
+            t = y - mean_x
+            var_comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+        mid = np.nan
+        if nobs >= window:
+            mid = sum_x / nobs
+            if same_ct >= nobs:
+                mid = prev_value
+            elif neg_ct == 0 and mid < 0:
+                mid = 0.0
+            elif neg_ct == nobs and mid > 0:
+                mid = 0.0
+
+        std = np.nan
+        if nobs >= window and nobs > 1:
+            if same_ct >= nobs:
+                std = 0.0
+            else:
+                var = ssqdm_x / (nobs - 1.0)
+                std = np.sqrt(var) if var >= 0 else 0.0
+
+        middle[i] = mid
+        upper[i] = mid + std * num_std
+        lower[i] = mid - std * num_std
+
+    return upper, middle, lower
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _pymin(a, b):
+    """`min(a, b)` do Python: devolve `a` a menos que `b < a` (NaN incluído)."""
+    return b if b < a else a
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _pymax(a, b):
+    """`max(a, b)` do Python: devolve `a` a menos que `b > a` (NaN incluído)."""
+    return b if b > a else a
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _advance(positions, k, idx):
+    """Avança o ponteiro `k` até contar os elementos de `positions` <= idx."""
+    while k < len(positions) and positions[k] <= idx:
+        k += 1
+    return k
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _last_two(positions, k, start):
+    """Os dois elementos antes do ponteiro `k`, se ambos >= start (-1 se não houver)."""
+    if k < 2 or positions[k - 2] < start:
+        return -1, -1
+    return positions[k - 2], positions[k - 1]
+
+
+@njit(cache=True, nogil=True, inline='always')
+def _pair_moves(price1, price2, rsi1, rsi2, price_down, price_up, rsi_down, rsi_up):
+    """
+    Compara dois pivôs (preço e RSI) e devolve dois flags: preço caindo com
+    RSI subindo, e preço subindo com RSI caindo (além dos limiares).
+    """
+    falling = price2 < price1 * price_down and rsi2 > rsi1 * rsi_up
+    rising = price2 > price1 * price_up and rsi2 < rsi1 * rsi_down
+    return falling, rising
+
+
+@njit(cache=True, nogil=True)
+def _divergence_strength(price1, price2, rsi1, rsi2, bullish, volume_ratio, rsi, macd_hist, idx,
+                         volume_confirmation, volume_multiplier, rsi_oversold, rsi_overbought):
+    """Score ponderado de `RSIDivergenceStrategy._divergence_strength` em um candle."""
+    price_change = abs(price2 - price1) / price1 if price1 > 0 else 0.0
+    price_score = _pymin(price_change * 10, 1.0)
+
+    rsi_change = abs(rsi2 - rsi1) / 100
+    rsi_score = _pymin(rsi_change * 5, 1.0)
+
+    vol_ratio = volume_ratio[idx] if volume_ratio[idx] == volume_ratio[idx] else 1.0
+    if volume_confirmation:
+        volume_score = _pymin(vol_ratio / volume_multiplier, 1.0)
+    else:
+        volume_score = 0.5
+
+    current_rsi = rsi[idx] if rsi[idx] == rsi[idx] else 50.0
+    if bullish:
+        rsi_zone_score = _pymax(0.0, (rsi_oversold - current_rsi + 20) / 40)
+    else:
+        rsi_zone_score = _pymax(0.0, (current_rsi - rsi_overbought + 20) / 40)
+    rsi_zone_score = _pymin(rsi_zone_score, 1.0)
+
+    hist = macd_hist[idx] if macd_hist[idx] == macd_hist[idx] else 0.0
+    hist_prev = macd_hist[idx - 1] if idx > 0 and macd_hist[idx - 1] == macd_hist[idx - 1] else hist
+    if bullish:
+        macd_score = 1.0 if hist > hist_prev else 0.3
+    else:
+        macd_score = 1.0 if hist < hist_prev else 0.3
+
+    final_score = 0.0
+    final_score += price_score * 0.25
+    final_score += rsi_score * 0.25
+    final_score += volume_score * 0.20
+    final_score += rsi_zone_score * 0.15
+    final_score += macd_score * 0.15
+    return _pymin(_pymax(final_score, 0.0), 1.0)
+
+
+@njit(cache=True, nogil=True)
+def divergence_scan(low, high, close, rsi, sma_trend, volume_ratio, macd_hist, adx,
+                    price_peaks, price_valleys, rsi_peaks, rsi_valleys,
+                    lookback, threshold, min_strength, volume_confirmation, volume_multiplier,
+                    rsi_oversold, rsi_overbought, min_adx):
+    """
+    Varredura de divergências de `RSIDivergenceStrategy` em um único loop.
+
+    Reproduz o caminho NumPy de `RSIDivergenceStrategy._scan_divergences`
+    (padrões, força e filtros) candle a candle. `*_peaks`/`*_valleys` são
+    as posições (ordenadas) dos picos e vales. Devolve, por candle, o código do sinal
+    (0 HOLD, 1 BUY, 2 SELL), o padrão (0 nenhum, 1 bullish, 2 bearish,
+    3 hidden bullish, 4 hidden bearish) e a força.
+    """
+    n = len(close)
+    signal = np.zeros(n, dtype=np.int8)
+    pattern = np.zeros(n, dtype=np.int8)
+    strength = np.full(n, 0.5)
+
+    # Ponteiros para o primeiro pico/vale ainda não alcançado: como `idx` só
+    # avança, os dois últimos de cada lista mudam apenas ao cruzar um novo
+    # elemento (O(1) amortizado por candle, sem busca)
+    k_pv = k_rv = k_pp = k_rp = 0
+    # Último candle com sinal emitido (-1: nenhum), para o filtro de 5 candles
+    last_signal = -1
+
+    # Fatores de limiar calculados uma única vez
+    price_down = 1 - threshold
+    price_up = 1 + threshold
+    rsi_down = 1 - threshold / 10
+    rsi_up = 1 + threshold / 10
+
+    for idx in range(2 * lookback, n):
+        start = idx - 2 * lookback
+        k_pv = _advance(price_valleys, k_pv, idx)
+        k_rv = _advance(rsi_valleys, k_rv, idx)
+        k_pp = _advance(price_peaks, k_pp, idx)
+        k_rp = _advance(rsi_peaks, k_rp, idx)
+        pv1, pv2 = _last_two(price_valleys, k_pv, start)
+        rv1, rv2 = _last_two(rsi_valleys, k_rv, start)
+        pp1, pp2 = _last_two(price_peaks, k_pp, start)
+        rp1, rp2 = _last_two(rsi_peaks, k_rp, start)
+        has_valleys = pv1 >= 0 and rv1 >= 0
+        has_peaks = pp1 >= 0 and rp1 >= 0
+
+        current_price = close[idx]
+        has_trend = sma_trend[idx] == sma_trend[idx]
+        found = 0
+        score = 0.0
+
+        # Vales: queda de preço com RSI subindo é divergência de alta; alta de
+        # preço com RSI caindo é a oculta de alta (com tendência de alta)
+        valley_regular = valley_hidden = False
+        if has_valleys:
+            valley_regular, valley_hidden = _pair_moves(low[pv1], low[pv2], rsi[rv1], rsi[rv2],
+                                                        price_down, price_up, rsi_down, rsi_up)
+            valley_hidden = valley_hidden and has_trend and current_price > sma_trend[idx]
+        # Picos: os mesmos movimentos com os papéis trocados
+        peak_regular = peak_hidden = False
+        if has_peaks:
+            peak_hidden, peak_regular = _pair_moves(high[pp1], high[pp2], rsi[rp1], rsi[rp2],
+                                                    price_down, price_up, rsi_down, rsi_up)
+            peak_hidden = peak_hidden and has_trend and current_price < sma_trend[idx]
+
+        # A força de cada par é calculada uma única vez; hidden divergences
+        # têm menos peso. Vale o primeiro padrão na ordem alta, baixa, oculta
+        # de alta e oculta de baixa
+        valley_score = peak_score = 0.0
+        if valley_regular or valley_hidden:
+            valley_score = _divergence_strength(low[pv1], low[pv2], rsi[rv1], rsi[rv2], True,
+                                                volume_ratio, rsi, macd_hist, idx, volume_confirmation,
+                                                volume_multiplier, rsi_oversold, rsi_overbought)
+        if peak_regular or peak_hidden:
+            peak_score = _divergence_strength(high[pp1], high[pp2], rsi[rp1], rsi[rp2], False,
+                                              volume_ratio, rsi, macd_hist, idx, volume_confirmation,
+                                              volume_multiplier, rsi_oversold, rsi_overbought)
+
+        if valley_regular and valley_score >= min_strength:
+            found, score = 1, valley_score
+        elif peak_regular and peak_score >= min_strength:
+            found, score = 2, peak_score
+        elif valley_hidden and valley_score * 0.9 >= min_strength:
+            found, score = 3, valley_score * 0.9
+        elif peak_hidden and peak_score * 0.9 >= min_strength:
+            found, score = 4, peak_score * 0.9
+
+        if found == 0:
+            continue
+
+        # Filtros: ADX, volume, sinal recente e RSI fora da zona neutra
+        adx_value = adx[idx] if adx[idx] == adx[idx] else 0.0
+        if adx_value < min_adx:
+            continue
+        if volume_confirmation:
+            vol_ratio = volume_ratio[idx] if volume_ratio[idx] == volume_ratio[idx] else 0.0
+            if vol_ratio < volume_multiplier and score < 0.7:
+                continue
+        if idx >= 5 and last_signal >= 0 and idx - last_signal <= 5:
+            continue
+        current_rsi = rsi[idx] if rsi[idx] == rsi[idx] else 50.0
+        if 45 < current_rsi < 55 and score < 0.8:
+            continue
+
+        signal[idx] = 1 if found == 1 or found == 3 else 2
+        pattern[idx] = found
+        strength[idx] = score
+        last_signal = idx
+
+    return signal, pattern, strength
+
+
+def warmup() -> None:
+    """
+    Compila todos os kernels com os tipos usados em produção.
+
+    Com `cache=True` o código de máquina fica gravado em `__pycache__`, então
+    rodar esta função na construção da imagem (ver Dockerfile) elimina a
+    compilação JIT no primeiro backtest de cada processo. Deve ser chamada
+    pelo mesmo caminho de import usado em produção (`src.strategies`).
+    """
+    if not NUMBA_AVAILABLE:
+        return
+
+    values = np.linspace(1.0, 2.0, 8)
+    rolling_mean(values, 3)
+    rolling_std(values, 3)
+    rolling_max(values, 3)
+    rolling_min(values, 3)
+    ewm_mean(values, 0.5)
+    max_drawdown(values)
+    true_range(values, values, values, np.empty(8))
+    ewm_mean(values, 0.5, 3)
+    atr(values, values, values, 3, 1.0 / 3)
+    rsi(values, 3, 1.0 / 3, np.empty(8))
+    macd(values, 0.5, 0.25, 0.2)
+    bollinger(values, 3, 2.0)
+    positions = np.arange(8)
+    divergence_scan(values, values, values, values, values, values, values, values,
+                    positions, positions, positions, positions,
+                    1, 0.02, 0.5, True, 1.2, 30.0, 70.0, 20.0)
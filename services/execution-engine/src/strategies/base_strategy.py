@@ -7,8 +7,13 @@ Define a interface comum que todas as estratégias devem implementar,
 incluindo cálculo de indicadores, geração de sinais e gestão de risco.
 """
 
+import hashlib
+import os
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 
@@ -16,8 +21,43 @@ import pandas as pd
 import numpy as np
 from loguru import logger
 
+from . import _indicators
+from . import indicator_cache
 
-@dataclass
+
+# Colunas que não entram no dicionário de indicadores de um Signal
+_NON_INDICATOR_COLUMNS = frozenset([
+    'time', 'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'signal', 'signal_strength', 'stop_loss', 'take_profit', 'position_size',
+])
+
+# Colunas de sinal propagadas para frente por `run()`: o último stop/alvo/
+# tamanho de posição continua valendo nos candles HOLD seguintes. Indicadores
+# mantêm o NaN do aquecimento (dados insuficientes).
+_FORWARD_FILL_COLUMNS = ('signal_strength', 'stop_loss', 'take_profit', 'position_size')
+
+# Colunas OHLCV exigidas por `validate_data`
+_REQUIRED_COLUMNS = frozenset(['open', 'high', 'low', 'close', 'volume'])
+
+# Mínimo de candles aceito por `validate_data`
+MIN_DATA_ROWS = 50
+
+# Aquecimento de uma EMA em múltiplos do período: após 5 períodos o peso do
+# valor inicial na EMA cai abaixo de 1e-4
+EMA_WARMUP_SPANS = 5
+
+# A coluna 'signal' é categórica: códigos int8 (1 byte por candle) sobre os
+# rótulos abaixo. Comparações com 'BUY'/'SELL'/'HOLD' continuam funcionando.
+SIGNAL_LABELS = ('HOLD', 'BUY', 'SELL')
+SIGNAL_DTYPE = pd.CategoricalDtype(list(SIGNAL_LABELS))
+SIG_HOLD, SIG_BUY, SIG_SELL = 0, 1, 2
+
+# Direção (+1 compra, -1 venda, 0 fora) indexada pelo código do sinal; a
+# última posição atende o código -1 (NaN) do pandas
+SIGNAL_DIRECTION = np.array([0, 1, -1, 0], dtype=np.int8)
+
+
+@dataclass(slots=True)
 class Signal:
     """Representa um sinal de trading."""
     timestamp: datetime
@@ -33,6 +73,7 @@ class Signal:
     
     def to_dict(self) -> Dict:
         """Converte para dicionário."""
+        # isinstance (e não __class__ is) para que pd.Timestamp também use ISO
         return {
             "timestamp": self.timestamp.isoformat() if isinstance(self.timestamp, datetime) else str(self.timestamp),
             "signal": self.signal_type,
@@ -45,6 +86,12 @@ class Signal:
             "indicators": self.indicators,
             "reason": self.reason,
         }
+    
+    @staticmethod
+    def batch_to_dicts(signals: List["Signal"]) -> List[Dict]:
+        """Converte vários sinais com uma única busca do método `to_dict`."""
+        to_dict = Signal.to_dict
+        return [to_dict(signal) for signal in signals]
 
 
 class BaseStrategy(ABC):
@@ -82,23 +129,49 @@ class BaseStrategy(ABC):
     description: str = "Estratégia base abstrata"
     version: str = "1.0.0"
     
-    def __init__(self, params: Optional[Dict] = None):
+    def __init__(self, params: Optional[Dict] = None, ctx: Optional["indicator_cache.IndicatorCache"] = None):
         """
         Inicializa a estratégia.
         
         Args:
             params: Parâmetros customizados (opcional).
                    Se None, usa default_params().
+            ctx: Cache de indicadores da varredura (opcional), compartilhado
+                 com as outras estratégias que rodam sobre os mesmos candles.
+                 Se None, os indicadores são calculados sem cache.
         """
         self.params = self.default_params()
         if params:
             self.params.update(params)
         
+        self.ctx = ctx if ctx is not None else indicator_cache.uncached
+        
         self.signals: List[Signal] = []
         self.performance: Dict[str, Any] = {}
+        self._metrics_cache: Optional[Tuple] = None
+        self._signal_cache: Optional[Tuple] = None
+        # Instâncias são compartilhadas entre threads (cache do StrategyManager)
+        self._signal_lock = threading.Lock()
         
         logger.debug(f"Estratégia '{self.name}' inicializada com params: {self.params}")
     
+    @property
+    def min_required_bars(self) -> Optional[int]:
+        """
+        Número de candles finais suficiente para reproduzir o sinal do último
+        candle (modo tempo real).
+        
+        Indicadores de janela (SMA, máximas/mínimas) ficam exatos com a
+        janela completa; EMAs e as médias de Wilder (RSI, ATR) usam
+        `EMA_WARMUP_SPANS` períodos de aquecimento e ficam equivalentes dentro
+        dessa tolerância.
+        
+        Returns:
+            Quantidade de candles, ou None se a estratégia precisa do
+            histórico completo.
+        """
+        return None
+    
     @abstractmethod
     def default_params(self) -> Dict:
         """
@@ -114,6 +187,14 @@ class BaseStrategy(ABC):
         """
         Calcula os indicadores técnicos necessários.
         
+        As colunas são adicionadas diretamente em `df` (sem cópia defensiva);
+        quem precisar preservar o DataFrame original deve passar uma cópia.
+        `run()` já faz essa cópia uma única vez, e ela é rasa: os arrays
+        OHLCV continuam compartilhados com o chamador. Por isso as
+        implementações só acrescentam ou substituem colunas inteiras
+        (`df[col] = ...`, `set_columns`) e nunca escrevem in-place nas
+        colunas de entrada (`df.loc[..., "close"] = ...`, `values[...] = ...`).
+        
         Args:
             df: DataFrame com colunas OHLCV (open, high, low, close, volume).
             
@@ -127,12 +208,14 @@ class BaseStrategy(ABC):
         """
         Gera sinais de compra/venda baseados nos indicadores.
         
+        Assim como `calculate_indicators`, escreve as colunas em `df` in-place.
+        
         Args:
             df: DataFrame com dados OHLCV e indicadores calculados.
             
         Returns:
             DataFrame com coluna 'signal' adicionada.
-            Valores: 'BUY', 'SELL', 'HOLD' (ou 1, -1, 0 para numérico)
+            Valores: 'BUY', 'SELL', 'HOLD' (categórica, ver `signal_column`)
         """
         pass
     
@@ -146,20 +229,16 @@ class BaseStrategy(ABC):
         Returns:
             Tupla (is_valid, message)
         """
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        
-        # Verificar colunas (case insensitive)
-        df_cols_lower = [c.lower() for c in df.columns]
-        
-        for col in required_columns:
-            if col not in df_cols_lower:
-                return False, f"Coluna necessária '{col}' não encontrada"
-        
         if df.empty:
             return False, "DataFrame está vazio"
         
-        if len(df) < 50:
-            return False, f"Dados insuficientes: {len(df)} linhas (mínimo: 50)"
+        # Verificar colunas (case insensitive) com uma diferença de conjuntos
+        missing = _REQUIRED_COLUMNS - {c.lower() for c in df.columns}
+        if missing:
+            return False, f"Colunas necessárias não encontradas: {sorted(missing)}"
+        
+        if len(df) < MIN_DATA_ROWS:
+            return False, f"Dados insuficientes: {len(df)} linhas (mínimo: {MIN_DATA_ROWS})"
         
         return True, "OK"
     
@@ -171,10 +250,17 @@ class BaseStrategy(ABC):
             df: DataFrame original.
             
         Returns:
-            DataFrame com colunas normalizadas.
+            DataFrame com colunas normalizadas. Se os nomes já estiverem em
+            lowercase, o próprio `df` é devolvido, sem cópia.
         """
-        df = df.copy()
-        df.columns = [c.lower() for c in df.columns]
+        columns = [c.lower() for c in df.columns]
+        if columns == list(df.columns):
+            return df
+        
+        # Cópia rasa: só o índice de colunas muda, os dados continuam
+        # compartilhados com o DataFrame original
+        df = df.copy(deep=False)
+        df.columns = columns
         return df
     
     def run(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -192,15 +278,18 @@ class BaseStrategy(ABC):
         """
         try:
             # Normalizar colunas
-            df = self.normalize_columns(df)
+            df_strategy = self.normalize_columns(df)
             
             # Validar dados
-            is_valid, message = self.validate_data(df)
+            is_valid, message = self.validate_data(df_strategy)
             if not is_valid:
                 raise ValueError(f"Dados inválidos: {message}")
             
-            # Criar cópia para não modificar original
-            df_strategy = df.copy()
+            # Cópia rasa defensiva: as estratégias só acrescentam ou substituem
+            # colunas inteiras (`set_columns`), nunca escrevem nos arrays de
+            # entrada, então os dados OHLCV podem ser compartilhados com `df`
+            if df_strategy is df:
+                df_strategy = df.copy(deep=False)
             
             # Calcular indicadores
             logger.info(f"{self.name}: Calculando indicadores...")
@@ -210,8 +299,10 @@ class BaseStrategy(ABC):
             logger.info(f"{self.name}: Gerando sinais de trading...")
             df_strategy = self.generate_signals(df_strategy)
             
-            # Limpar NaN (preencher para frente e para trás)
-            df_strategy = df_strategy.bfill().ffill()
+            # Propagar stop/alvo/tamanho do último sinal (só para frente)
+            fill_columns = [c for c in _FORWARD_FILL_COLUMNS if c in df_strategy.columns]
+            if fill_columns:
+                df_strategy[fill_columns] = df_strategy[fill_columns].ffill()
             
             logger.info(f"{self.name}: Estratégia executada com sucesso - {len(df_strategy)} candles")
             return df_strategy
@@ -220,51 +311,109 @@ class BaseStrategy(ABC):
             logger.error(f"{self.name}: Erro ao executar estratégia - {e}")
             raise
     
-    def get_current_signal(self, df: pd.DataFrame) -> Signal:
+    def run_many(self, dfs: List[pd.DataFrame], max_workers: Optional[int] = None) -> List[pd.DataFrame]:
+        """
+        Executa `run()` sobre vários DataFrames (ex.: um por ativo) em threads.
+        
+        Os kernels de indicadores em `_numba` liberam o GIL (`nogil=True`),
+        então as séries são processadas em paralelo nos núcleos disponíveis.
+        Cada `run()` trabalha sobre sua própria cópia e o cache de
+        indicadores é protegido por lock.
+        
+        Args:
+            dfs: DataFrames com dados OHLCV.
+            max_workers: Número de threads (default: os.cpu_count()).
+            
+        Returns:
+            Resultados de `run()` na mesma ordem de `dfs`.
+        """
+        if len(dfs) <= 1:
+            return [self.run(df) for df in dfs]
+        
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(self.run, dfs))
+    
+    def get_current_signal(self, df: pd.DataFrame, run: bool = True) -> Signal:
         """
         Retorna o sinal atual (último candle).
         
+        Em tempo real a mesma janela de candles costuma chegar várias vezes
+        até o próximo fechamento; com `run=True`, o último sinal fica
+        memorizado pelos parâmetros, nomes das colunas e `fingerprint` de
+        todas as colunas da janela, e uma chamada com os mesmos candles
+        devolve uma cópia dele sem rodar o pipeline. Qualquer candle
+        revisado, inclusive no meio da janela, muda a chave. O digest é
+        linear no tamanho da janela, que em tempo real é só
+        `min_required_bars` candles. Janelas com colunas não numéricas
+        (ex.: tempo em string) não são memorizadas.
+        
         Args:
             df: DataFrame com dados OHLCV.
+            run: Se False, `df` já é a saída de `run()` e o pipeline não é
+                executado de novo (só o último candle é lido).
             
         Returns:
             Objeto Signal com informações do sinal atual.
         """
-        df = self.run(df)
-        last = df.iloc[-1]
-        
-        # Extrair indicadores (excluindo colunas padrão)
-        exclude_cols = ['time', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 
-                       'signal', 'signal_strength', 'stop_loss', 'take_profit', 'position_size']
-        
-        indicators = {}
-        for k, v in last.items():
-            if k not in exclude_cols:
-                try:
-                    if isinstance(v, (int, float, np.number)) and pd.notna(v) and np.isfinite(v):
-                        indicators[k] = float(v)
-                except (ValueError, TypeError):
-                    pass
+        if run:
+            # Sem coluna de tempo o timestamp do sinal é `datetime.now()`,
+            # que não pode ser reaproveitado
+            key = None
+            columns = {str(c).lower() for c in df.columns}
+            if len(df) and ('time' in columns or 'timestamp' in columns):
+                arrays = [df[col].to_numpy() for col in df.columns]
+                if all(arr.dtype.kind in 'biufmM' for arr in arrays):
+                    key = (tuple(self.params.items()), tuple(df.columns), fingerprint(*arrays))
+            if key is not None:
+                with self._signal_lock:
+                    cached = self._signal_cache
+                if cached is not None and cached[0] == key:
+                    return replace(cached[1], indicators=dict(cached[1].indicators))
+            
+            signal = self.get_current_signal(self.run(df), run=False)
+            if key is not None:
+                with self._signal_lock:
+                    self._signal_cache = (key, replace(signal, indicators=dict(signal.indicators)))
+            return signal
+        
+        def _last(col: str, default: Any = None) -> Any:
+            # Acesso escalar O(1) por coluna, sem materializar a última linha
+            # inteira como Series (que força um dtype comum a todas as colunas)
+            return df[col].iat[-1] if col in df.columns else default
+        
+        def _last_float(col: str) -> Optional[float]:
+            value = _last(col)
+            return float(value) if pd.notna(value) else None
+        
+        # Extrair indicadores (colunas numéricas fora das colunas padrão),
+        # filtrando NaN/inf em uma única passada vetorizada
+        positions = [
+            i for i, (col, dtype) in enumerate(df.dtypes.items())
+            if col not in _NON_INDICATOR_COLUMNS and dtype.kind in 'iuf'
+        ]
+        values = df.iloc[-1, positions].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(values)
+        indicators = dict(zip(df.columns[positions][finite], values[finite].tolist()))
         
         # Determinar timestamp
-        if 'time' in last:
-            timestamp = last['time']
-        elif 'timestamp' in last:
-            timestamp = last['timestamp']
+        if 'time' in df.columns:
+            timestamp = _last('time')
+        elif 'timestamp' in df.columns:
+            timestamp = _last('timestamp')
         else:
             timestamp = datetime.now()
         
         return Signal(
             timestamp=timestamp,
-            signal_type=str(last.get('signal', 'HOLD')),
-            price=float(last['close']),
-            strength=float(last.get('signal_strength', 0.5)),
+            signal_type=str(_last('signal', 'HOLD')),
+            price=float(_last('close')),
+            strength=float(_last('signal_strength', 0.5)),
             strategy_name=self.name,
-            stop_loss=float(last['stop_loss']) if pd.notna(last.get('stop_loss')) else None,
-            take_profit=float(last['take_profit']) if pd.notna(last.get('take_profit')) else None,
-            position_size=float(last['position_size']) if pd.notna(last.get('position_size')) else None,
+            stop_loss=_last_float('stop_loss'),
+            take_profit=_last_float('take_profit'),
+            position_size=_last_float('position_size'),
             indicators=indicators,
-            reason=str(last.get('signal_reason', ''))
+            reason=str(_last('signal_reason', ''))
         )
     
     def get_entry_conditions(self) -> List[str]:
@@ -285,6 +434,47 @@ class BaseStrategy(ABC):
         """
         return []
     
+    def _compute_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Calcula as estatísticas dos retornos da estratégia em uma única passada.
+        
+        Retornos e drawdown são calculados sobre arrays NumPy, sem copiar o
+        DataFrame. O resultado fica memorizado para o último `df` recebido
+        (referência fraca + tamanho), então `calculate_sharpe_ratio` seguido de
+        `calculate_max_drawdown` sobre a mesma saída de `run()` calcula tudo
+        uma vez só.
+        
+        Args:
+            df: DataFrame com colunas 'close' e 'signal'.
+            
+        Returns:
+            Dicionário com count, mean, std, max_drawdown e total_return dos
+            retornos.
+        """
+        cached = self._metrics_cache
+        if cached is not None and cached[0]() is df and cached[1] == len(df):
+            return cached[2]
+        
+        close = df['close'].to_numpy(dtype=np.float64)
+        direction = signal_direction(df['signal'])
+        
+        # Posição do candle anterior aplicada ao retorno do candle atual
+        strategy_returns = (close[1:] / close[:-1] - 1.0) * direction[:-1]
+        valid = strategy_returns[~np.isnan(strategy_returns)]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = float(np.std(valid, ddof=1)) if len(valid) > 1 else np.nan
+        
+        metrics = {
+            'count': len(valid),
+            'mean': float(valid.mean()) if len(valid) else np.nan,
+            'std': std,
+            'max_drawdown': float(_indicators.max_drawdown(strategy_returns)),
+            'total_return': float(np.prod(1.0 + np.nan_to_num(strategy_returns, nan=0.0)) - 1.0),
+        }
+        self._metrics_cache = (weakref.ref(df), len(df), metrics)
+        return metrics
+    
     def calculate_sharpe_ratio(self, df: pd.DataFrame, risk_free_rate: float = 0.0) -> float:
         """
         Calcula o Sharpe Ratio da estratégia.
@@ -299,28 +489,14 @@ class BaseStrategy(ABC):
         if 'signal' not in df.columns:
             return 0.0
         
-        df = df.copy()
-        
-        # Converter sinais string para numérico
-        if df['signal'].dtype == object:
-            signal_map = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
-            df['signal_num'] = df['signal'].map(signal_map).fillna(0)
-        else:
-            df['signal_num'] = df['signal']
-        
-        # Calcular retornos
-        df['returns'] = df['close'].pct_change()
-        df['strategy_returns'] = df['returns'] * df['signal_num'].shift(1)
-        
-        # Remover NaN
-        strategy_returns = df['strategy_returns'].dropna()
+        metrics = self._compute_metrics(df)
         
-        if len(strategy_returns) == 0 or strategy_returns.std() == 0:
+        if metrics['count'] == 0 or metrics['std'] == 0:
             return 0.0
         
-        # Calcular Sharpe (anualizado para 252 dias de trading)
-        excess_returns = strategy_returns - risk_free_rate / 252
-        sharpe = np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+        # Calcular Sharpe (anualizado para 252 dias de trading); subtrair a
+        # taxa livre de risco não altera o desvio padrão
+        sharpe = np.sqrt(252) * (metrics['mean'] - risk_free_rate / 252) / metrics['std']
         
         return float(sharpe) if np.isfinite(sharpe) else 0.0
     
@@ -337,27 +513,24 @@ class BaseStrategy(ABC):
         if 'signal' not in df.columns:
             return 0.0
         
-        df = df.copy()
-        
-        # Converter sinais string para numérico
-        if df['signal'].dtype == object:
-            signal_map = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
-            df['signal_num'] = df['signal'].map(signal_map).fillna(0)
-        else:
-            df['signal_num'] = df['signal']
-        
-        # Calcular retornos acumulados
-        df['returns'] = df['close'].pct_change()
-        df['strategy_returns'] = df['returns'] * df['signal_num'].shift(1)
-        df['cumulative'] = (1 + df['strategy_returns'].fillna(0)).cumprod()
+        max_dd = self._compute_metrics(df)['max_drawdown']
         
-        # Calcular drawdown
-        df['peak'] = df['cumulative'].cummax()
-        df['drawdown'] = (df['cumulative'] - df['peak']) / df['peak']
+        return abs(max_dd) if np.isfinite(max_dd) else 0.0
+    
+    def calculate_total_return(self, df: pd.DataFrame) -> float:
+        """
+        Calcula o retorno total composto da estratégia.
         
-        max_dd = df['drawdown'].min()
+        Args:
+            df: DataFrame com coluna 'close' e 'signal'.
+            
+        Returns:
+            Retorno total (0.1 = 10%).
+        """
+        if 'signal' not in df.columns:
+            return 0.0
         
-        return abs(float(max_dd)) if np.isfinite(max_dd) else 0.0
+        return self._compute_metrics(df)['total_return']
     
     def get_info(self) -> Dict[str, Any]:
         """
@@ -386,46 +559,162 @@ class BaseStrategy(ABC):
 # HELPER FUNCTIONS
 # ==============================================================================
 
+def set_columns(df: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Grava várias colunas em `df` de uma vez.
+    
+    Colunas novas são agrupadas por dtype e inseridas com um único
+    `df[nomes] = bloco_2d` por grupo, então o BlockManager ganha um bloco por
+    dtype em vez de um por coluna (sem fragmentação nem reconsolidação).
+    Colunas já existentes são sobrescritas no lugar. Ao contrário de
+    `df.assign`, não copia o DataFrame.
+    
+    Args:
+        df: DataFrame de destino (modificado no lugar).
+        columns: Nome da coluna → array/Series com o mesmo comprimento
+            (Series devem ter o índice de `df`).
+        
+    Returns:
+        O próprio `df`.
+    """
+    groups: Dict[np.dtype, List[str]] = {}
+    values = {}
+    
+    for name, column in columns.items():
+        if isinstance(column, pd.Categorical):
+            # Categóricas (ex.: 'signal') não entram em blocos 2D
+            df[name] = column
+            continue
+        values[name] = np.asarray(column)
+        if name in df.columns:
+            df[name] = values[name]
+        else:
+            groups.setdefault(values[name].dtype, []).append(name)
+    
+    for names in groups.values():
+        df[names] = np.column_stack([values[name] for name in names])
+    
+    return df
+
+
+def signal_column(codes: np.ndarray) -> pd.Categorical:
+    """
+    Monta a coluna 'signal' a partir dos códigos SIG_HOLD/SIG_BUY/SIG_SELL.
+    
+    Args:
+        codes: Array int8 com um código por candle.
+        
+    Returns:
+        Categórica com os rótulos de `SIGNAL_LABELS`, sem cópia dos códigos.
+    """
+    return pd.Categorical.from_codes(codes, dtype=SIGNAL_DTYPE)
+
+
+def reason_dtype(buy_reason: str, sell_reason: str) -> pd.CategoricalDtype:
+    """
+    Tipo categórico da coluna 'signal_reason' de uma estratégia.
+    
+    As categorias seguem a ordem dos códigos de sinal ('' para HOLD), então
+    os mesmos códigos int8 de 'signal' servem para montar os motivos.
+    """
+    return pd.CategoricalDtype(['', buy_reason, sell_reason])
+
+
+def reason_column(codes: np.ndarray, dtype: pd.CategoricalDtype) -> pd.Categorical:
+    """
+    Monta a coluna 'signal_reason' a partir dos códigos de sinal.
+    
+    Args:
+        codes: Mesmos códigos int8 usados em `signal_column`.
+        dtype: Motivos da estratégia (ver `reason_dtype`).
+        
+    Returns:
+        Categórica com o motivo de cada candle.
+    """
+    return pd.Categorical.from_codes(codes, dtype=dtype)
+
+
+def signal_direction(signal: pd.Series) -> np.ndarray:
+    """
+    Converte a coluna 'signal' em direção: +1 (BUY), -1 (SELL), 0 (HOLD).
+    
+    Aceita a coluna categórica das estratégias (lookup direto pelos códigos),
+    strings soltas ou uma coluna já numérica.
+    
+    Args:
+        signal: Coluna de sinais.
+        
+    Returns:
+        Array com a direção de cada candle.
+    """
+    if isinstance(signal.dtype, pd.CategoricalDtype) and tuple(signal.cat.categories) == SIGNAL_LABELS:
+        return SIGNAL_DIRECTION[signal.cat.codes.to_numpy()]
+    if signal.dtype == object or isinstance(signal.dtype, pd.CategoricalDtype):
+        signal_map = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
+        return signal.map(signal_map).astype(np.float64).fillna(0).to_numpy()
+    return signal.to_numpy()
+
+
+def fingerprint(*arrays: np.ndarray) -> bytes:
+    """
+    Digest do conteúdo de arrays numéricos (ex.: colunas de uma janela).
+    
+    BLAKE2b de 128 bits sobre dtype, tamanho e bytes de cada array, lidos
+    direto do buffer (sem `tobytes()`). Serve de chave para memos que
+    precisam reconhecer os mesmos candles, como o regime de mercado e o
+    último sinal: colisões são desprezíveis, ao contrário de um `hash()` de
+    64 bits. O custo é linear no tamanho, então deve ser usado sobre janelas
+    curtas, não sobre o histórico inteiro.
+    
+    Args:
+        arrays: Arrays 1-D de dtype numérico ou datetime64.
+        
+    Returns:
+        Digest de 16 bytes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        digest.update(f"{arr.dtype.str}:{arr.shape}".encode())
+        digest.update(arr)
+    return digest.digest()
+
+
 def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
-    Calcula Average True Range (ATR).
+    Calcula Average True Range (ATR) com a suavização de Wilder.
     
     Args:
         df: DataFrame com colunas high, low, close.
-        period: Período para média móvel.
+        period: Período da suavização (alpha = 1/period).
         
     Returns:
         Série com valores ATR.
     """
-    high_low = df['high'] - df['low']
-    high_close = (df['high'] - df['close'].shift()).abs()
-    low_close = (df['low'] - df['close'].shift()).abs()
-    
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = true_range.rolling(window=period).mean()
-    
-    return atr
+    atr = _indicators.atr(
+        df['high'].to_numpy(dtype=np.float64),
+        df['low'].to_numpy(dtype=np.float64),
+        df['close'].to_numpy(dtype=np.float64),
+        period
+    )
+    
+    return pd.Series(atr, index=df.index)
 
 
 def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
     """
-    Calcula Relative Strength Index (RSI).
+    Calcula Relative Strength Index (RSI) com a suavização de Wilder.
     
     Args:
         series: Série de preços (geralmente close).
-        period: Período do RSI.
+        period: Período do RSI (alpha = 1/period).
         
     Returns:
         Série com valores RSI (0-100).
     """
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    rsi = _indicators.rsi(series.to_numpy(dtype=np.float64), period)
     
-    return rsi
+    return pd.Series(rsi, index=series.index)
 
 
 def calculate_ema(series: pd.Series, period: int) -> pd.Series:
@@ -439,7 +728,23 @@ def calculate_ema(series: pd.Series, period: int) -> pd.Series:
     Returns:
         Série com valores EMA.
     """
-    return series.ewm(span=period, adjust=False).mean()
+    ema = _indicators.ema(series.to_numpy(dtype=np.float64), period)
+    
+    return pd.Series(ema, index=series.index)
+
+
+def ema_warmup_bars(period: int) -> int:
+    """Candles de aquecimento para uma EMA de `period` (ver `EMA_WARMUP_SPANS`)."""
+    return EMA_WARMUP_SPANS * period
+
+
+def wilder_warmup_bars(period: int) -> int:
+    """
+    Candles de aquecimento para a suavização de Wilder de `period` (RSI, ATR).
+
+    `alpha = 1/period` equivale a uma EMA de span `2 * period - 1`.
+    """
+    return ema_warmup_bars(2 * period - 1)
 
 
 def calculate_sma(series: pd.Series, period: int) -> pd.Series:
@@ -453,7 +758,29 @@ def calculate_sma(series: pd.Series, period: int) -> pd.Series:
     Returns:
         Série com valores SMA.
     """
-    return series.rolling(window=period).mean()
+    sma = _indicators.rolling_mean(series.to_numpy(dtype=np.float64), period)
+    
+    return pd.Series(sma, index=series.index)
+
+
+def calculate_volume_sma(volume: pd.Series, period: int = 20) -> pd.Series:
+    """
+    Calcula a média móvel do volume.
+    
+    Args:
+        volume: Série de volumes.
+        period: Período da média.
+        
+    Returns:
+        Série com a média de volume.
+    """
+    # Volumes inteiros mantêm o dtype: `volume_sma` usa a soma cumulativa exata
+    values = volume.to_numpy()
+    if values.dtype.kind not in 'iu':
+        values = values.astype(np.float64, copy=False)
+    sma = _indicators.volume_sma(values, period)
+    
+    return pd.Series(sma, index=volume.index)
 
 
 def calculate_bollinger_bands(series: pd.Series, period: int = 20, std_dev: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
@@ -468,13 +795,10 @@ def calculate_bollinger_bands(series: pd.Series, period: int = 20, std_dev: floa
     Returns:
         Tupla (upper_band, middle_band, lower_band).
     """
-    middle = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
+    upper, middle, lower = _indicators.bollinger(series.to_numpy(dtype=np.float64), period, std_dev)
     
-    upper = middle + (std * std_dev)
-    lower = middle - (std * std_dev)
-    
-    return upper, middle, lower
+    index = series.index
+    return pd.Series(upper, index=index), pd.Series(middle, index=index), pd.Series(lower, index=index)
 
 
 def calculate_macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
@@ -490,14 +814,12 @@ def calculate_macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: in
     Returns:
         Tupla (macd_line, signal_line, histogram).
     """
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
+    macd_line, signal_line, histogram = _indicators.macd(
+        series.to_numpy(dtype=np.float64), fast, slow, signal
+    )
     
-    return macd_line, signal_line, histogram
+    index = series.index
+    return pd.Series(macd_line, index=index), pd.Series(signal_line, index=index), pd.Series(histogram, index=index)
 
 
 def calculate_adx(df: pd.DataFrame, period: int = 14) -> Tuple[pd.Series, pd.Series, pd.Series]:
@@ -512,10 +834,11 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> Tuple[pd.Series, pd.Ser
         Tupla (adx, di_plus, di_minus).
     """
     # True Range
-    high_low = df['high'] - df['low']
-    high_close = (df['high'] - df['close'].shift()).abs()
-    low_close = (df['low'] - df['close'].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    tr = _indicators.true_range(
+        df['high'].to_numpy(dtype=np.float64),
+        df['low'].to_numpy(dtype=np.float64),
+        df['close'].to_numpy(dtype=np.float64)
+    )
     
     # Directional Movement
     up_move = df['high'] - df['high'].shift()
@@ -525,12 +848,14 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> Tuple[pd.Series, pd.Ser
     minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
     
     # Smoothed averages
-    atr = tr.rolling(window=period).mean()
-    plus_di = 100 * pd.Series(plus_dm).rolling(window=period).mean() / atr
-    minus_di = 100 * pd.Series(minus_dm).rolling(window=period).mean() / atr
+    atr = _indicators.rolling_mean(tr, period)
+    plus_di = 100 * _indicators.rolling_mean(plus_dm.astype(np.float64), period) / atr
+    minus_di = 100 * _indicators.rolling_mean(minus_dm.astype(np.float64), period) / atr
     
     # ADX
-    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
-    adx = dx.rolling(window=period).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = _indicators.rolling_mean(dx, period)
     
-    return adx, plus_di, minus_di
+    index = df.index
+    return pd.Series(adx, index=index), pd.Series(plus_di, index=index), pd.Series(minus_di, index=index)
@@ -15,7 +15,25 @@ from typing import Dict, List
 import pandas as pd
 import numpy as np
 
-from .base_strategy import BaseStrategy, calculate_atr
+from . import _indicators
+from .base_strategy import (
+    BaseStrategy,
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    reason_column,
+    reason_dtype,
+    set_columns,
+    signal_column,
+    wilder_warmup_bars
+)
+
+
+# Motivos indexados pelos códigos de sinal (HOLD, BUY, SELL)
+_REASON_DTYPE = reason_dtype(
+    "Rompimento de resistência + Volume alto",
+    "Rompimento de suporte + Volume alto"
+)
 
 
 class BreakoutStrategy(BaseStrategy):
@@ -30,91 +48,111 @@ class BreakoutStrategy(BaseStrategy):
     description = "Rompimento de suporte/resistência com volume"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        "lookback_period": 20,
+        "volume_mult": 1.5,
+        "atr_period": 14,
+        "atr_mult": 0.5,  # Margem para confirmar rompimento
+        "sl_atr_mult": 2.0,
+        "tp_atr_mult": 4.0
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            "lookback_period": 20,
-            "volume_mult": 1.5,
-            "atr_period": 14,
-            "atr_mult": 0.5,  # Margem para confirmar rompimento
-            "sl_atr_mult": 2.0,
-            "tp_atr_mult": 4.0
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        return max(
+            self.params["lookback_period"] + 1,
+            wilder_warmup_bars(self.params["atr_period"]),
+            20
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        
         # Suporte e Resistência
-        df["resistance"] = df["high"].rolling(window=self.params["lookback_period"]).max()
-        df["support"] = df["low"].rolling(window=self.params["lookback_period"]).min()
+        lookback = self.params["lookback_period"]
+        resistance = _indicators.rolling_max(df["high"].to_numpy(dtype=np.float64), lookback)
+        support = _indicators.rolling_min(df["low"].to_numpy(dtype=np.float64), lookback)
         
         # ATR
-        df["atr"] = calculate_atr(df, self.params["atr_period"])
+        atr = self.ctx.atr(df, self.params["atr_period"])
         
         # Volume
-        df["volume_sma"] = df["volume"].rolling(window=20).mean()
-        df["volume_ratio"] = df["volume"] / df["volume_sma"]
+        volume_sma = self.ctx.volume_sma(df["volume"], 20)
+        volume_ratio = df["volume"] / volume_sma
         
         # Distância do suporte/resistência
-        df["dist_resistance"] = (df["resistance"] - df["close"]) / df["atr"]
-        df["dist_support"] = (df["close"] - df["support"]) / df["atr"]
+        dist_resistance = (resistance - df["close"]) / atr
+        dist_support = (df["close"] - support) / atr
         
-        return df
+        return set_columns(df, {
+            "resistance": resistance,
+            "support": support,
+            "atr": atr,
+            "volume_sma": volume_sma,
+            "volume_ratio": volume_ratio,
+            "dist_resistance": dist_resistance,
+            "dist_support": dist_support,
+        })
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["signal"] = "HOLD"
-        df["signal_strength"] = 0.5
-        df["signal_reason"] = ""
+        close = df["close"].to_numpy()
+        atr = df["atr"].to_numpy()
+        resistance = df["resistance"].to_numpy()
+        support = df["support"].to_numpy()
+        margin = atr[1:] * self.params["atr_mult"]
+        volume_ratio = df["volume_ratio"].to_numpy()
+        high_volume = volume_ratio > self.params["volume_mult"]
         
-        margin = df["atr"] * self.params["atr_mult"]
+        # Candle atual ([1:]) contra o nível do candle anterior ([:-1])
+        breakout_up = np.zeros(len(df), dtype=bool)
+        breakout_down = np.zeros(len(df), dtype=bool)
         
         # Rompimento de alta
-        breakout_up = (
-            (df["close"] > df["resistance"].shift(1) + margin) &
-            (df["close"].shift(1) <= df["resistance"].shift(1)) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+        breakout_up[1:] = (
+            (close[1:] > resistance[:-1] + margin) &
+            (close[:-1] <= resistance[:-1]) &
+            high_volume[1:]
         )
         
         # Rompimento de baixa
-        breakout_down = (
-            (df["close"] < df["support"].shift(1) - margin) &
-            (df["close"].shift(1) >= df["support"].shift(1)) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+        breakout_down[1:] = (
+            (close[1:] < support[:-1] - margin) &
+            (close[:-1] >= support[:-1]) &
+            high_volume[1:]
         )
         
-        df.loc[breakout_up, "signal"] = "BUY"
-        df.loc[breakout_up, "signal_reason"] = "Rompimento de resistência + Volume alto"
+        # Máscaras convertidas uma única vez em índices posicionais
+        up_idx = np.flatnonzero(breakout_up)
+        down_idx = np.flatnonzero(breakout_down)
         
-        df.loc[breakout_down, "signal"] = "SELL"
-        df.loc[breakout_down, "signal_reason"] = "Rompimento de suporte + Volume alto"
+        signal = np.full(len(df), SIG_HOLD, dtype=np.int8)
+        signal[up_idx] = SIG_BUY
+        signal[down_idx] = SIG_SELL
         
         # Força baseada no volume
-        df.loc[breakout_up | breakout_down, "signal_strength"] = (
-            0.5 + df.loc[breakout_up | breakout_down, "volume_ratio"].clip(1, 3) / 6
-        )
+        strength = np.full(len(df), 0.5)
+        strength[up_idx] = 0.5 + np.clip(volume_ratio[up_idx], 1, 3) / 6
+        strength[down_idx] = 0.5 + np.clip(volume_ratio[down_idx], 1, 3) / 6
         
-        # Stop Loss e Take Profit
-        df["stop_loss"] = np.where(
-            df["signal"] == "BUY",
-            df["resistance"].shift(1) - (df["atr"] * 0.5),
-            np.where(
-                df["signal"] == "SELL",
-                df["support"].shift(1) + (df["atr"] * 0.5),
-                np.nan
-            )
-        )
+        # Stop logo além do nível rompido do candle anterior e alvo em ATR,
+        # calculados só nos candles com sinal
+        tp_mult = self.params["tp_atr_mult"]
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[up_idx] = resistance[up_idx - 1] - atr[up_idx] * 0.5
+        stop_loss[down_idx] = support[down_idx - 1] + atr[down_idx] * 0.5
         
-        df["take_profit"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] + (df["atr"] * self.params["tp_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] - (df["atr"] * self.params["tp_atr_mult"]),
-                np.nan
-            )
-        )
+        take_profit = np.full(len(df), np.nan)
+        take_profit[up_idx] = close[up_idx] + atr[up_idx] * tp_mult
+        take_profit[down_idx] = close[down_idx] - atr[down_idx] * tp_mult
         
-        return df
+        return set_columns(df, {
+            "signal": signal_column(signal),
+            "signal_strength": strength,
+            "signal_reason": reason_column(signal, _REASON_DTYPE),
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+        })
     
     def get_entry_conditions(self) -> List[str]:
         return [
@@ -24,18 +24,32 @@ DISCLAIMER: Esta estratégia é para fins educacionais.
 Gestão de risco adequada é fundamental para preservação de capital.
 """
 
+import math
 from typing import Dict, List, Any, Optional
 
 import pandas as pd
 import numpy as np
 from loguru import logger
 
+from . import _indicators
 from .base_strategy import (
     BaseStrategy,
-    calculate_atr,
-    calculate_rsi,
-    calculate_ema,
-    calculate_bollinger_bands
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    ema_warmup_bars,
+    wilder_warmup_bars,
+    reason_column,
+    reason_dtype,
+    set_columns,
+    signal_column
+)
+
+
+# Motivos indexados pelos códigos de sinal (HOLD, BUY, SELL)
+_REASON_DTYPE = reason_dtype(
+    'EMA crossover bullish + RSI em range',
+    'EMA crossover bearish + RSI elevado'
 )
 
 
@@ -57,115 +71,143 @@ class DynamicPositionSizingStrategy(BaseStrategy):
     description = "Position Sizing dinâmico com Kelly Criterion + ATR"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        # Gestão de risco
+        'risk_per_trade': 0.02,  # 2% de risco por trade
+        'max_position_size': 0.25,  # Máximo 25% do capital por posição
+        'kelly_fraction': 0.5,  # Usar 50% do Kelly (Half Kelly)
+        
+        # ATR
+        'atr_period': 14,
+        'atr_multiplier': 2.0,
+        
+        # EMAs para sinais
+        'ema_fast': 20,
+        'ema_slow': 50,
+        
+        # RSI
+        'rsi_period': 14,
+        'rsi_lower': 40,
+        'rsi_upper': 70,
+        
+        # Stop/Take Profit
+        'sl_atr_mult': 2.0,
+        'tp_atr_mult': 3.0,
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            # Gestão de risco
-            'risk_per_trade': 0.02,  # 2% de risco por trade
-            'max_position_size': 0.25,  # Máximo 25% do capital por posição
-            'kelly_fraction': 0.5,  # Usar 50% do Kelly (Half Kelly)
-            
-            # ATR
-            'atr_period': 14,
-            'atr_multiplier': 2.0,
-            
-            # EMAs para sinais
-            'ema_fast': 20,
-            'ema_slow': 50,
-            
-            # RSI
-            'rsi_period': 14,
-            'rsi_lower': 40,
-            'rsi_upper': 70,
-            
-            # Stop/Take Profit
-            'sl_atr_mult': 2.0,
-            'tp_atr_mult': 3.0,
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        return max(
+            ema_warmup_bars(self.params['ema_slow']),
+            20,
+            wilder_warmup_bars(self.params['rsi_period']),
+            wilder_warmup_bars(self.params['atr_period'])
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calcula ATR, EMAs, RSI e Bollinger Bands para análise de volatilidade.
         """
-        df = df.copy()
-        
         # ATR para medir volatilidade
-        df['atr'] = calculate_atr(df, self.params['atr_period'])
+        atr = self.ctx.atr(df, self.params['atr_period'])
         
         # ATR percentual (volatilidade normalizada)
-        df['atr_pct'] = (df['atr'] / df['close']) * 100
+        atr_pct = (atr / df['close']) * 100
         
         # Bollinger Bands Width (outra medida de volatilidade)
-        bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(df['close'])
-        df['bb_upper'] = bb_upper
-        df['bb_middle'] = bb_middle
-        df['bb_lower'] = bb_lower
-        df['bb_width'] = (bb_upper - bb_lower) / bb_middle
+        bb_upper, bb_middle, bb_lower = self.ctx.bollinger(df['close'])
+        bb_width = (bb_upper - bb_lower) / bb_middle
         
         # EMAs para tendência
-        df['ema_fast'] = calculate_ema(df['close'], self.params['ema_fast'])
-        df['ema_slow'] = calculate_ema(df['close'], self.params['ema_slow'])
+        ema_fast = self.ctx.ema(df['close'], self.params['ema_fast'])
+        ema_slow = self.ctx.ema(df['close'], self.params['ema_slow'])
         
         # RSI para timing
-        df['rsi'] = calculate_rsi(df['close'], self.params['rsi_period'])
+        rsi = self.ctx.rsi(df['close'], self.params['rsi_period'])
         
         # Tendência
-        df['trend'] = np.where(df['ema_fast'] > df['ema_slow'], 1, -1)
-        
-        return df
+        trend = np.where(ema_fast > ema_slow, 1, -1)
+        
+        return set_columns(df, {
+            'atr': atr,
+            'atr_pct': atr_pct,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'bb_width': bb_width,
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+            'rsi': rsi,
+            'trend': trend,
+        })
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Gera sinais E calcula tamanho da posição dinamicamente.
         """
-        df = df.copy()
-        
-        df['signal'] = 'HOLD'
-        df['signal_strength'] = 0.5
-        df['position_size'] = 0.0
-        df['stop_loss'] = np.nan
-        df['take_profit'] = np.nan
-        df['signal_reason'] = ''
+        params = self.params
+        rsi_lower = params['rsi_lower']
+        rsi_upper = params['rsi_upper']
         
         # Sinais básicos de entrada (EMA crossover + RSI)
+        ema_fast = df['ema_fast'].to_numpy()
+        ema_slow = df['ema_slow'].to_numpy()
+        rsi = df['rsi'].to_numpy()
+        
         buy_condition = (
-            (df['ema_fast'] > df['ema_slow']) &
-            (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1)) &  # Cruzamento
-            (df['rsi'] > self.params['rsi_lower']) & 
-            (df['rsi'] < self.params['rsi_upper'])
+            _indicators.crossed_above(ema_fast, ema_slow) &  # Cruzamento
+            (rsi > rsi_lower) & 
+            (rsi < rsi_upper)
         )
         
         sell_condition = (
-            (df['ema_fast'] < df['ema_slow']) &
-            (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1)) &  # Cruzamento
-            (df['rsi'] > 100 - self.params['rsi_upper'])
+            _indicators.crossed_below(ema_fast, ema_slow) &  # Cruzamento
+            (rsi > 100 - rsi_upper)
         )
         
-        df.loc[buy_condition, 'signal'] = 'BUY'
-        df.loc[buy_condition, 'signal_reason'] = 'EMA crossover bullish + RSI em range'
+        # Máscaras convertidas uma única vez em índices posicionais
+        buy_idx = np.flatnonzero(buy_condition)
+        sell_idx = np.flatnonzero(sell_condition)
         
-        df.loc[sell_condition, 'signal'] = 'SELL'
-        df.loc[sell_condition, 'signal_reason'] = 'EMA crossover bearish + RSI elevado'
+        signal = np.full(len(df), SIG_HOLD, dtype=np.int8)
+        signal[buy_idx] = SIG_BUY
+        signal[sell_idx] = SIG_SELL
         
         # Calcular tamanho de posição dinâmico para cada candle
-        df['position_size'] = self._calculate_position_sizes(df)
+        position_size = self._calculate_position_sizes(df)
         
         # Calcular força do sinal baseada em múltiplos fatores
-        df['signal_strength'] = self._calculate_signal_strength(df)
-        
-        # Stop-loss e Take-profit baseados em ATR
-        for idx in df.index:
-            if df.loc[idx, 'signal'] == 'BUY':
-                atr = df.loc[idx, 'atr'] if pd.notna(df.loc[idx, 'atr']) else 0
-                df.loc[idx, 'stop_loss'] = df.loc[idx, 'close'] - (self.params['sl_atr_mult'] * atr)
-                df.loc[idx, 'take_profit'] = df.loc[idx, 'close'] + (self.params['tp_atr_mult'] * atr)
-            elif df.loc[idx, 'signal'] == 'SELL':
-                atr = df.loc[idx, 'atr'] if pd.notna(df.loc[idx, 'atr']) else 0
-                df.loc[idx, 'stop_loss'] = df.loc[idx, 'close'] + (self.params['sl_atr_mult'] * atr)
-                df.loc[idx, 'take_profit'] = df.loc[idx, 'close'] - (self.params['tp_atr_mult'] * atr)
-        
-        return df
+        strength = self._calculate_signal_strength(df, buy_idx, sell_idx)
+        
+        # Stop-loss e Take-profit baseados em ATR (ATR ausente conta como 0),
+        # calculados só nos candles com sinal
+        close = df['close'].to_numpy()
+        atr = df['atr'].to_numpy()
+        atr = np.where(np.isnan(atr), 0.0, atr)
+        sl_offset = params['sl_atr_mult'] * atr
+        tp_offset = params['tp_atr_mult'] * atr
+        
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[buy_idx] = close[buy_idx] - sl_offset[buy_idx]
+        stop_loss[sell_idx] = close[sell_idx] + sl_offset[sell_idx]
+        
+        take_profit = np.full(len(df), np.nan)
+        take_profit[buy_idx] = close[buy_idx] + tp_offset[buy_idx]
+        take_profit[sell_idx] = close[sell_idx] - tp_offset[sell_idx]
+        
+        return set_columns(df, {
+            'signal': signal_column(signal),
+            'signal_strength': strength,
+            'position_size': position_size,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'signal_reason': reason_column(signal, _REASON_DTYPE),
+        })
     
-    def _calculate_position_sizes(self, df: pd.DataFrame) -> pd.Series:
+    def _calculate_position_sizes(self, df: pd.DataFrame) -> np.ndarray:
         """
         Calcula tamanho de posição usando Kelly Criterion simplificado.
         
@@ -175,58 +217,75 @@ class DynamicPositionSizingStrategy(BaseStrategy):
         - Volatilidade alta → posição menor
         - Volatilidade baixa → posição maior
         - Limitar ao máximo permitido
+        
+        Tudo roda sobre arrays NumPy float32, reaproveitando o mesmo buffer:
+        o tamanho é limitado a [0, max_position_size] e não precisa de mais
+        que ~7 dígitos significativos. O resultado volta como float64 para
+        manter o dtype da coluna `position_size`.
         """
-        risk_per_trade = self.params['risk_per_trade']
-        atr_multiplier = self.params['atr_multiplier']
-        max_position = self.params['max_position_size']
+        params = self.params
+        risk_per_trade = params['risk_per_trade']
+        atr_multiplier = params['atr_multiplier']
+        max_position = params['max_position_size']
         
         # Calcular risco por unidade (em percentual do preço)
         # risk_per_unit = quanto o preço pode mover contra nós (ATR * mult) / preço atual
-        risk_per_unit = (df['atr'] * atr_multiplier) / df['close']
+        # `copy=True`: os buffers são reescritos in-place (`out=`) e não podem
+        # ser uma view de colunas que já estejam em float32
+        atr = df['atr'].to_numpy(dtype=np.float32, copy=True)
+        close = df['close'].to_numpy(dtype=np.float32)
+        risk_per_unit = np.multiply(atr, np.float32(atr_multiplier), out=atr)
+        np.divide(risk_per_unit, close, out=risk_per_unit)
         
-        # Evitar divisão por zero
-        risk_per_unit = risk_per_unit.replace(0, np.nan).fillna(0.01)
+        # Evitar divisão por zero (ATR zero ou ainda indefinido vira 1%)
+        risk_per_unit[(risk_per_unit == 0) | np.isnan(risk_per_unit)] = 0.01
         
-        # Tamanho da posição = risco desejado / risco por unidade
-        position_size = risk_per_trade / risk_per_unit
-        
-        # Limitar ao máximo permitido
-        position_size = np.minimum(position_size, max_position)
+        # Tamanho da posição = risco desejado / risco por unidade, limitado ao
+        # máximo permitido
+        position_size = np.divide(np.float32(risk_per_trade), risk_per_unit, out=risk_per_unit)
+        np.minimum(position_size, np.float32(max_position), out=position_size)
         
         # Ajustar pela volatilidade (reduzir posição em alta volatilidade)
         # atr_pct médio histórico ~ 2%, se maior que isso, reduzir
-        volatility_adjustment = 1 / (1 + df['atr_pct'] / 5)
-        position_size = position_size * volatility_adjustment
+        atr_pct = df['atr_pct'].to_numpy(dtype=np.float32, copy=True)
+        position_size /= np.add(np.divide(atr_pct, np.float32(5), out=atr_pct), np.float32(1), out=atr_pct)
         
         # Garantir que está entre 0 e max_position
-        position_size = np.clip(position_size, 0, max_position)
-        
-        return position_size
+        np.clip(position_size, np.float32(0), np.float32(max_position), out=position_size)
+        return position_size.astype(np.float64)
     
-    def _calculate_signal_strength(self, df: pd.DataFrame) -> pd.Series:
+    def _calculate_signal_strength(
+        self,
+        df: pd.DataFrame,
+        buy_idx: np.ndarray,
+        sell_idx: np.ndarray
+    ) -> np.ndarray:
         """
         Calcula a força do sinal baseada em múltiplos fatores.
+        
+        `buy_idx`/`sell_idx` são as posições dos candles BUY/SELL já
+        calculadas em `generate_signals`. Tudo roda sobre arrays NumPy.
         """
-        strength = pd.Series(0.5, index=df.index)
+        rsi = df['rsi'].to_numpy()
         
         # Aumentar força se RSI está em zona favorável
-        rsi_strength = pd.Series(0.0, index=df.index)
+        rsi_strength = np.zeros(len(df))
         
         # Para BUY: RSI baixo é melhor
-        buy_mask = df['signal'] == 'BUY'
-        rsi_strength.loc[buy_mask] = (50 - df.loc[buy_mask, 'rsi'].clip(0, 50)) / 50 * 0.3
+        rsi_strength[buy_idx] = (50 - np.clip(rsi[buy_idx], 0, 50)) / 50 * 0.3
         
         # Para SELL: RSI alto é melhor
-        sell_mask = df['signal'] == 'SELL'
-        rsi_strength.loc[sell_mask] = (df.loc[sell_mask, 'rsi'].clip(50, 100) - 50) / 50 * 0.3
+        rsi_strength[sell_idx] = (np.clip(rsi[sell_idx], 50, 100) - 50) / 50 * 0.3
         
         # Força da tendência (distância entre EMAs)
-        ema_diff = (df['ema_fast'] - df['ema_slow']).abs() / df['close']
-        trend_strength = (ema_diff * 10).clip(0, 0.2)
+        ema_diff = np.abs(df['ema_fast'].to_numpy() - df['ema_slow'].to_numpy()) / df['close'].to_numpy()
+        trend_strength = np.clip(ema_diff * 10, 0, 0.2)
         
-        strength = 0.5 + rsi_strength + trend_strength
+        # Soma e limite in-place sobre o mesmo buffer
+        strength = np.add(rsi_strength, 0.5, out=rsi_strength)
+        strength += trend_strength
         
-        return strength.clip(0.0, 1.0)
+        return np.clip(strength, 0.0, 1.0, out=strength)
     
     @staticmethod
     def calculate_kelly_criterion(
@@ -366,39 +425,105 @@ class DynamicPositionSizingStrategy(BaseStrategy):
         if df.empty or 'position_size' not in df.columns:
             return {"error": "Dados insuficientes"}
         
-        last_row = df.iloc[-1]
+        # Leitura escalar das colunas usadas, sem montar a última linha
+        # inteira como Series
+        def _last(col: str) -> float:
+            return float(df[col].iat[-1]) if col in df.columns else math.nan
+        
+        close = _last('close')
+        atr = _last('atr')
+        atr_pct = _last('atr_pct')
+        position_size = _last('position_size')
+        sl = _last('stop_loss')
+        tp = _last('take_profit')
         
-        position_value = account_balance * last_row['position_size']
+        position_value = account_balance * position_size
         risk_amount = position_value * self.params['risk_per_trade']
         
         # Calcular risk/reward ratio
-        sl = last_row.get('stop_loss', np.nan)
-        tp = last_row.get('take_profit', np.nan)
-        close = last_row['close']
-        
-        if pd.notna(sl) and pd.notna(tp) and (close - sl) != 0:
+        if not math.isnan(sl) and not math.isnan(tp) and (close - sl) != 0:
             risk_reward = abs(tp - close) / abs(close - sl)
         else:
             risk_reward = 0
         
         return {
-            "current_price": float(last_row['close']),
-            "atr": float(last_row['atr']) if pd.notna(last_row['atr']) else 0,
-            "atr_pct": float(last_row['atr_pct']) if pd.notna(last_row['atr_pct']) else 0,
-            "recommended_position_size_pct": float(last_row['position_size'] * 100),
+            "current_price": close,
+            "atr": atr if not math.isnan(atr) else 0,
+            "atr_pct": atr_pct if not math.isnan(atr_pct) else 0,
+            "recommended_position_size_pct": position_size * 100,
             "position_value": float(position_value),
             "risk_per_trade": float(risk_amount),
-            "stop_loss": float(sl) if pd.notna(sl) else None,
-            "take_profit": float(tp) if pd.notna(tp) else None,
+            "stop_loss": sl if not math.isnan(sl) else None,
+            "take_profit": tp if not math.isnan(tp) else None,
             "risk_reward_ratio": float(risk_reward),
             "account_balance": float(account_balance),
-            "volatility_level": self._get_volatility_level(last_row),
+            "volatility_level": self._get_volatility_level(atr_pct),
         }
     
-    def _get_volatility_level(self, row: pd.Series) -> str:
-        """Classifica o nível de volatilidade."""
-        atr_pct = row.get('atr_pct', 0)
-        if pd.isna(atr_pct):
+    def analyze_risk_batch(self, df: pd.DataFrame, account_balance: float = 10000.0) -> pd.DataFrame:
+        """
+        Versão vetorizada de `analyze_risk` para todos os candles de uma vez.
+        
+        Quem percorre a saída de `run()` candle a candle (`iterrows`) para
+        avaliar risco deve usar este método: cada coluna é calculada em uma
+        única operação NumPy.
+        
+        Args:
+            df: DataFrame com dados e sinais (saída de `run()`).
+            account_balance: Saldo da conta.
+            
+        Returns:
+            DataFrame com o mesmo índice de `df` e as colunas de
+            `analyze_risk` (exceto account_balance, que é constante). Stop e
+            alvo ausentes ficam NaN em vez de None.
+        """
+        if df.empty or 'position_size' not in df.columns:
+            return pd.DataFrame(index=df.index)
+        
+        def _column(col: str) -> np.ndarray:
+            if col in df.columns:
+                return df[col].to_numpy(dtype=np.float64)
+            return np.full(len(df), np.nan)
+        
+        close = _column('close')
+        atr = _column('atr')
+        atr_pct = _column('atr_pct')
+        position_size = _column('position_size')
+        sl = _column('stop_loss')
+        tp = _column('take_profit')
+        
+        position_value = account_balance * position_size
+        
+        # Risk/reward só onde stop e alvo existem e o stop não é o preço atual
+        stop_distance = np.abs(close - sl)
+        valid = ~np.isnan(tp) & (stop_distance > 0)
+        risk_reward = np.zeros(len(df))
+        np.divide(np.abs(tp - close), stop_distance, out=risk_reward, where=valid)
+        
+        # Mesmas faixas de `_get_volatility_level` (limite superior aberto)
+        volatility_level = pd.cut(
+            atr_pct,
+            bins=[-np.inf, 1.0, 2.5, 4.0, np.inf],
+            labels=['low', 'medium', 'high', 'extreme'],
+            right=False,
+        ).add_categories('unknown').fillna('unknown')
+        
+        return pd.DataFrame({
+            'current_price': close,
+            'atr': np.nan_to_num(atr, nan=0.0),
+            'atr_pct': np.nan_to_num(atr_pct, nan=0.0),
+            'recommended_position_size_pct': position_size * 100,
+            'position_value': position_value,
+            'risk_per_trade': position_value * self.params['risk_per_trade'],
+            'stop_loss': sl,
+            'take_profit': tp,
+            'risk_reward_ratio': risk_reward,
+            'volatility_level': volatility_level,
+        }, index=df.index)
+    
+    def _get_volatility_level(self, atr_pct: float) -> str:
+        """Classifica o nível de volatilidade a partir do ATR percentual."""
+        if math.isnan(atr_pct):
             return 'unknown'
         
         if atr_pct < 1.0:
@@ -0,0 +1,163 @@
+"""
+B3 Trading Platform - Indicator Cache
+=======================================
+Cache de indicadores compartilhado entre estratégias em uma varredura.
+
+Quando várias estratégias rodam sobre os mesmos candles (comparação de
+estratégias, seleção por regime de mercado), RSI-14, ATR-14, EMAs, Bollinger
+Bands e a média de volume seriam recalculados uma vez por estratégia. O
+`IndicatorCache` memoriza cada resultado pela combinação (indicador,
+parâmetros, arrays de entrada).
+
+O cache vive uma varredura: quem roda as estratégias cria um
+`IndicatorCache`, passa-o como `ctx` e o descarta ao final (ver
+`StrategyManager.compare_strategies`). Um candle novo chega em um novo
+DataFrame e, portanto, em uma nova varredura, sem invalidação explícita.
+Estratégias criadas sem `ctx` calculam os indicadores direto (`uncached`).
+
+A chave identifica as entradas pelo buffer (endereço, forma, strides e
+dtype), em O(1), sem ler os dados: as estratégias recebem colunas do mesmo
+DataFrame (`run()` faz só uma cópia rasa), então os buffers se repetem
+entre elas. Cada entrada mantém uma referência às suas entradas, o que
+impede que o endereço seja reaproveitado por outro array enquanto ela
+existir. Como em `run()`, os DataFrames de uma varredura não devem ser
+alterados no lugar.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import base_strategy
+
+
+class IndicatorCache:
+    """
+    Cache LRU de indicadores técnicos de uma varredura, seguro entre threads.
+
+    Limitado por número de entradas (`maxsize`) e por bytes dos resultados
+    (`max_bytes`). Os resultados são devolvidos sem cópia, como Series
+    somente leitura: uma escrita no lugar levanta erro em vez de corromper o
+    cache. Com `maxsize=0` nada é armazenado e cada chamada calcula o
+    indicador direto.
+
+    Exemplo:
+        cache = IndicatorCache()
+        rsi = cache.rsi(df["close"], 14)  # calcula
+        rsi = cache.rsi(df["close"], 14)  # reutiliza
+    """
+
+    def __init__(self, maxsize: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[np.ndarray, ...], np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _identity(arr: np.ndarray) -> Tuple:
+        """Identifica o buffer de um array sem ler os dados."""
+        return (arr.__array_interface__["data"][0], arr.shape, arr.strides, arr.dtype.str)
+
+    def _get(
+        self,
+        name: str,
+        params: Tuple,
+        inputs: Tuple[pd.Series, ...],
+        compute: Callable[[], pd.Series]
+    ) -> pd.Series:
+        """Retorna o indicador do cache ou o calcula e armazena."""
+        if self.maxsize <= 0:
+            return compute()
+        return pd.Series(self._get_values(name, params, inputs, compute), index=inputs[0].index, copy=False)
+
+    def _get_values(
+        self,
+        name: str,
+        params: Tuple,
+        inputs: Tuple[pd.Series, ...],
+        compute: Callable[[], Any]
+    ) -> np.ndarray:
+        """Como `_get`, mas devolve o array armazenado (1-D ou 2-D)."""
+        arrays = tuple(s.to_numpy() for s in inputs)
+        key = (name, params, tuple(self._identity(arr) for arr in arrays))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        values = np.asarray(compute())
+        values.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1].nbytes
+            self._entries[key] = (arrays, values)
+            self.nbytes += values.nbytes
+            while self._entries and (len(self._entries) > self.maxsize or self.nbytes > self.max_bytes):
+                self.nbytes -= self._entries.popitem(last=False)[1][1].nbytes
+
+        return values
+
+    def ema(self, series: pd.Series, period: int) -> pd.Series:
+        """EMA memorizada (ver `calculate_ema`)."""
+        return self._get("ema", (period,), (series,),
+                         lambda: base_strategy.calculate_ema(series, period))
+
+    def sma(self, series: pd.Series, period: int) -> pd.Series:
+        """SMA memorizada (ver `calculate_sma`)."""
+        return self._get("sma", (period,), (series,),
+                         lambda: base_strategy.calculate_sma(series, period))
+
+    def volume_sma(self, volume: pd.Series, period: int = 20) -> pd.Series:
+        """Média de volume memorizada (ver `calculate_volume_sma`)."""
+        return self._get("volume_sma", (period,), (volume,),
+                         lambda: base_strategy.calculate_volume_sma(volume, period))
+
+    def rsi(self, series: pd.Series, period: int = 14) -> pd.Series:
+        """RSI memorizado (ver `calculate_rsi`)."""
+        return self._get("rsi", (period,), (series,),
+                         lambda: base_strategy.calculate_rsi(series, period))
+
+    def atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
+        """ATR memorizado (ver `calculate_atr`)."""
+        return self._get("atr", (period,), (df["high"], df["low"], df["close"]),
+                         lambda: base_strategy.calculate_atr(df, period))
+
+    def bollinger(
+        self,
+        series: pd.Series,
+        period: int = 20,
+        std_dev: float = 2.0
+    ) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """Bollinger Bands memorizadas (ver `calculate_bollinger_bands`)."""
+        if self.maxsize <= 0:
+            return base_strategy.calculate_bollinger_bands(series, period, std_dev)
+        upper, middle, lower = self._get_values(
+            "bollinger", (period, std_dev), (series,),
+            lambda: np.vstack(base_strategy.calculate_bollinger_bands(series, period, std_dev))
+        )
+        index = series.index
+        return (pd.Series(upper, index=index, copy=False), pd.Series(middle, index=index, copy=False),
+                pd.Series(lower, index=index, copy=False))
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# Cache desativado: padrão das estratégias criadas sem `ctx`
+uncached = IndicatorCache(maxsize=0)
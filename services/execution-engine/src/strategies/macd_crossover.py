@@ -15,7 +15,26 @@ from typing import Dict, List
 import pandas as pd
 import numpy as np
 
-from .base_strategy import BaseStrategy, calculate_atr, calculate_macd
+from . import _indicators
+from .base_strategy import (
+    BaseStrategy,
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    ema_warmup_bars,
+    wilder_warmup_bars,
+    reason_column,
+    reason_dtype,
+    set_columns,
+    signal_column
+)
+
+
+# Motivos indexados pelos códigos de sinal (HOLD, BUY, SELL)
+_REASON_DTYPE = reason_dtype(
+    "MACD crossover bullish + Volume alto",
+    "MACD crossover bearish + Volume alto"
+)
 
 
 class MACDCrossoverStrategy(BaseStrategy):
@@ -30,92 +49,108 @@ class MACDCrossoverStrategy(BaseStrategy):
     description = "Cruzamento MACD com confirmação de volume"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        "macd_fast": 12,
+        "macd_slow": 26,
+        "macd_signal": 9,
+        "volume_sma": 20,
+        "volume_mult": 1.2,
+        "atr_period": 14,
+        "sl_atr_mult": 2.0,
+        "tp_atr_mult": 3.0
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            "macd_fast": 12,
-            "macd_slow": 26,
-            "macd_signal": 9,
-            "volume_sma": 20,
-            "volume_mult": 1.2,
-            "atr_period": 14,
-            "sl_atr_mult": 2.0,
-            "tp_atr_mult": 3.0
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        return max(
+            ema_warmup_bars(self.params["macd_slow"]) + ema_warmup_bars(self.params["macd_signal"]),
+            self.params["volume_sma"],
+            wilder_warmup_bars(self.params["atr_period"])
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        
-        # MACD
-        df["macd_line"], df["macd_signal"], df["macd_histogram"] = calculate_macd(
-            df["close"],
-            fast=self.params["macd_fast"],
-            slow=self.params["macd_slow"],
-            signal=self.params["macd_signal"]
+        # MACD a partir das EMAs do cache da varredura: na comparação de
+        # estratégias as EMAs 12/26 também servem à `rsi_divergence`
+        ema_fast = self.ctx.ema(df["close"], self.params["macd_fast"])
+        ema_slow = self.ctx.ema(df["close"], self.params["macd_slow"])
+        macd_line, macd_signal, macd_histogram = _indicators.macd_from_emas(
+            ema_fast.to_numpy(), ema_slow.to_numpy(), self.params["macd_signal"]
         )
         
         # ATR
-        df["atr"] = calculate_atr(df, self.params["atr_period"])
+        atr = self.ctx.atr(df, self.params["atr_period"])
         
         # Volume
-        df["volume_sma"] = df["volume"].rolling(window=self.params["volume_sma"]).mean()
-        df["volume_ratio"] = df["volume"] / df["volume_sma"]
+        volume_sma = self.ctx.volume_sma(df["volume"], self.params["volume_sma"])
+        volume_ratio = df["volume"] / volume_sma
         
-        return df
+        return set_columns(df, {
+            "macd_line": macd_line,
+            "macd_signal": macd_signal,
+            "macd_histogram": macd_histogram,
+            "atr": atr,
+            "volume_sma": volume_sma,
+            "volume_ratio": volume_ratio,
+        })
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["signal"] = "HOLD"
-        df["signal_strength"] = 0.5
-        df["signal_reason"] = ""
+        macd_line = df["macd_line"].to_numpy()
+        macd_signal = df["macd_signal"].to_numpy()
+        histogram = df["macd_histogram"].to_numpy()
+        high_volume = df["volume_ratio"].to_numpy() > self.params["volume_mult"]
         
         # Cruzamento para cima
         buy_condition = (
-            (df["macd_line"] > df["macd_signal"]) &
-            (df["macd_line"].shift(1) <= df["macd_signal"].shift(1)) &
-            (df["macd_histogram"] > 0) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+            _indicators.crossed_above(macd_line, macd_signal) &
+            (histogram > 0) &
+            high_volume
         )
         
         # Cruzamento para baixo
         sell_condition = (
-            (df["macd_line"] < df["macd_signal"]) &
-            (df["macd_line"].shift(1) >= df["macd_signal"].shift(1)) &
-            (df["macd_histogram"] < 0) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+            _indicators.crossed_below(macd_line, macd_signal) &
+            (histogram < 0) &
+            high_volume
         )
         
-        df.loc[buy_condition, "signal"] = "BUY"
-        df.loc[buy_condition, "signal_reason"] = "MACD crossover bullish + Volume alto"
+        # Máscaras convertidas uma única vez em índices posicionais
+        buy_idx = np.flatnonzero(buy_condition)
+        sell_idx = np.flatnonzero(sell_condition)
         
-        df.loc[sell_condition, "signal"] = "SELL"
-        df.loc[sell_condition, "signal_reason"] = "MACD crossover bearish + Volume alto"
+        signal = np.full(len(df), SIG_HOLD, dtype=np.int8)
+        signal[buy_idx] = SIG_BUY
+        signal[sell_idx] = SIG_SELL
         
-        # Força baseada no histograma
-        df.loc[buy_condition, "signal_strength"] = 0.6 + abs(df.loc[buy_condition, "macd_histogram"]).clip(0, 100) / 250
-        df.loc[sell_condition, "signal_strength"] = 0.6 + abs(df.loc[sell_condition, "macd_histogram"]).clip(0, 100) / 250
+        # Força baseada no histograma: a mesma fórmula para BUY e SELL, então
+        # uma única passada sobre os candles com sinal
+        signal_idx = np.concatenate((buy_idx, sell_idx))
+        strength = np.full(len(df), 0.5)
+        strength[signal_idx] = 0.6 + np.minimum(np.abs(histogram[signal_idx]), 100) / 250
         
-        # Stop Loss e Take Profit
-        df["stop_loss"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] - (df["atr"] * self.params["sl_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] + (df["atr"] * self.params["sl_atr_mult"]),
-                np.nan
-            )
-        )
+        # Stop Loss e Take Profit em ATR, calculados só nos candles com sinal
+        close = df["close"].to_numpy()
+        atr = df["atr"].to_numpy()
+        sl_mult = self.params["sl_atr_mult"]
+        tp_mult = self.params["tp_atr_mult"]
         
-        df["take_profit"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] + (df["atr"] * self.params["tp_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] - (df["atr"] * self.params["tp_atr_mult"]),
-                np.nan
-            )
-        )
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[buy_idx] = close[buy_idx] - atr[buy_idx] * sl_mult
+        stop_loss[sell_idx] = close[sell_idx] + atr[sell_idx] * sl_mult
+        
+        take_profit = np.full(len(df), np.nan)
+        take_profit[buy_idx] = close[buy_idx] + atr[buy_idx] * tp_mult
+        take_profit[sell_idx] = close[sell_idx] - atr[sell_idx] * tp_mult
         
-        return df
+        return set_columns(df, {
+            "signal": signal_column(signal),
+            "signal_strength": strength,
+            "signal_reason": reason_column(signal, _REASON_DTYPE),
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+        })
     
     def get_entry_conditions(self) -> List[str]:
         return [
@@ -17,9 +17,21 @@ import numpy as np
 
 from .base_strategy import (
     BaseStrategy,
-    calculate_atr,
-    calculate_rsi,
-    calculate_bollinger_bands
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    reason_column,
+    reason_dtype,
+    set_columns,
+    signal_column,
+    wilder_warmup_bars
+)
+
+
+# Motivos indexados pelos códigos de sinal (HOLD, BUY, SELL)
+_REASON_DTYPE = reason_dtype(
+    "Preço abaixo BB inferior + RSI sobrevendido",
+    "Preço acima BB superior + RSI sobrecomprado"
 )
 
 
@@ -35,88 +47,104 @@ class MeanReversionStrategy(BaseStrategy):
     description = "Reversão à média com Bollinger Bands + RSI"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        "bb_period": 20,
+        "bb_std": 2.0,
+        "rsi_period": 14,
+        "rsi_oversold": 25,
+        "rsi_overbought": 75,
+        "atr_period": 14,
+        "sl_atr_mult": 1.5,
+        "tp_atr_mult": 2.0
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            "bb_period": 20,
-            "bb_std": 2.0,
-            "rsi_period": 14,
-            "rsi_oversold": 25,
-            "rsi_overbought": 75,
-            "atr_period": 14,
-            "sl_atr_mult": 1.5,
-            "tp_atr_mult": 2.0
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        return max(
+            self.params["bb_period"],
+            wilder_warmup_bars(self.params["rsi_period"]),
+            wilder_warmup_bars(self.params["atr_period"])
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        
         # Bollinger Bands
-        df["bb_upper"], df["bb_middle"], df["bb_lower"] = calculate_bollinger_bands(
+        bb_upper, bb_middle, bb_lower = self.ctx.bollinger(
             df["close"], 
             period=self.params["bb_period"],
             std_dev=self.params["bb_std"]
         )
-        df["bb_width"] = (df["bb_upper"] - df["bb_lower"]) / df["bb_middle"]
-        df["bb_pct"] = (df["close"] - df["bb_lower"]) / (df["bb_upper"] - df["bb_lower"])
+        bb_width = (bb_upper - bb_lower) / bb_middle
+        bb_pct = (df["close"] - bb_lower) / (bb_upper - bb_lower)
         
         # RSI
-        df["rsi"] = calculate_rsi(df["close"], self.params["rsi_period"])
+        rsi = self.ctx.rsi(df["close"], self.params["rsi_period"])
         
         # ATR
-        df["atr"] = calculate_atr(df, self.params["atr_period"])
+        atr = self.ctx.atr(df, self.params["atr_period"])
         
-        return df
+        return set_columns(df, {
+            "bb_upper": bb_upper,
+            "bb_middle": bb_middle,
+            "bb_lower": bb_lower,
+            "bb_width": bb_width,
+            "bb_pct": bb_pct,
+            "rsi": rsi,
+            "atr": atr,
+        })
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["signal"] = "HOLD"
-        df["signal_strength"] = 0.5
-        df["signal_reason"] = ""
+        close = df["close"].to_numpy()
+        rsi = df["rsi"].to_numpy()
+        bb_pct = df["bb_pct"].to_numpy()
         
         # Compra: preço abaixo da banda inferior + RSI sobrevendido
         buy_condition = (
-            (df["close"] < df["bb_lower"]) &
-            (df["rsi"] < self.params["rsi_oversold"])
+            (close < df["bb_lower"].to_numpy()) &
+            (rsi < self.params["rsi_oversold"])
         )
         
         # Venda: preço acima da banda superior + RSI sobrecomprado
         sell_condition = (
-            (df["close"] > df["bb_upper"]) &
-            (df["rsi"] > self.params["rsi_overbought"])
+            (close > df["bb_upper"].to_numpy()) &
+            (rsi > self.params["rsi_overbought"])
         )
         
-        df.loc[buy_condition, "signal"] = "BUY"
-        df.loc[buy_condition, "signal_reason"] = "Preço abaixo BB inferior + RSI sobrevendido"
+        # Máscaras convertidas uma única vez em índices posicionais
+        buy_idx = np.flatnonzero(buy_condition)
+        sell_idx = np.flatnonzero(sell_condition)
         
-        df.loc[sell_condition, "signal"] = "SELL"
-        df.loc[sell_condition, "signal_reason"] = "Preço acima BB superior + RSI sobrecomprado"
+        signal = np.full(len(df), SIG_HOLD, dtype=np.int8)
+        signal[buy_idx] = SIG_BUY
+        signal[sell_idx] = SIG_SELL
         
         # Força baseada na distância das bandas
-        df.loc[buy_condition, "signal_strength"] = 0.5 + (1 - df.loc[buy_condition, "bb_pct"].clip(0, 1)) * 0.5
-        df.loc[sell_condition, "signal_strength"] = 0.5 + df.loc[sell_condition, "bb_pct"].clip(0, 1) * 0.5
+        strength = np.full(len(df), 0.5)
+        strength[buy_idx] = 0.5 + (1 - np.clip(bb_pct[buy_idx], 0, 1)) * 0.5
+        strength[sell_idx] = 0.5 + np.clip(bb_pct[sell_idx], 0, 1) * 0.5
         
-        # Stop Loss e Take Profit
-        df["stop_loss"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] - (df["atr"] * self.params["sl_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] + (df["atr"] * self.params["sl_atr_mult"]),
-                np.nan
-            )
-        )
+        # Stop Loss em ATR e alvo na média (middle band), calculados só nos
+        # candles com sinal
+        atr = df["atr"].to_numpy()
+        sl_mult = self.params["sl_atr_mult"]
         
-        df["take_profit"] = np.where(
-            df["signal"] == "BUY",
-            df["bb_middle"],  # Alvo: média (middle band)
-            np.where(
-                df["signal"] == "SELL",
-                df["bb_middle"],
-                np.nan
-            )
-        )
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[buy_idx] = close[buy_idx] - atr[buy_idx] * sl_mult
+        stop_loss[sell_idx] = close[sell_idx] + atr[sell_idx] * sl_mult
+        
+        signal_idx = np.concatenate((buy_idx, sell_idx))
+        take_profit = np.full(len(df), np.nan)
+        take_profit[signal_idx] = df["bb_middle"].to_numpy()[signal_idx]
         
-        return df
+        return set_columns(df, {
+            "signal": signal_column(signal),
+            "signal_strength": strength,
+            "signal_reason": reason_column(signal, _REASON_DTYPE),
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+        })
     
     def get_entry_conditions(self) -> List[str]:
         return [
@@ -29,36 +29,127 @@ DISCLAIMER: Esta estratégia é para fins educacionais.
 Resultados passados não garantem resultados futuros.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 import pandas as pd
 import numpy as np
-from loguru import logger
 
+from . import _indicators
+from . import _numba
 from .base_strategy import (
     BaseStrategy, 
-    calculate_atr, 
-    calculate_rsi, 
-    calculate_ema,
-    calculate_sma,
-    calculate_macd,
-    calculate_adx
+    calculate_adx,
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    ema_warmup_bars,
+    wilder_warmup_bars,
+    set_columns,
+    signal_column
 )
 
 
-@dataclass
-class DivergencePattern:
-    """Representa um padrão de divergência detectado."""
-    pattern_type: str  # 'bullish', 'bearish', 'hidden_bullish', 'hidden_bearish'
-    signal: str  # 'BUY' ou 'SELL'
-    strength: float  # 0.0 a 1.0
-    price_point1: float
-    price_point2: float
-    rsi_point1: float
-    rsi_point2: float
-    index: int
-    description: str
+# Códigos dos padrões de divergência (0 = nenhum), os mesmos de
+# `_numba.divergence_scan`
+_BULLISH, _BEARISH, _HIDDEN_BULLISH, _HIDDEN_BEARISH = 1, 2, 3, 4
+
+# Tipo e descrição (colunas categóricas: os códigos int8 do padrão viram os
+# códigos da categoria, sem strings por candle) e sinal indexados pelo
+# código do padrão
+_PATTERN_TYPES = pd.CategoricalDtype([
+    '', 'bullish_divergence', 'bearish_divergence', 'hidden_bullish', 'hidden_bearish'
+])
+_PATTERN_DESCRIPTIONS = pd.CategoricalDtype([
+    '',
+    'Divergência de Alta: Preço ↓ RSI ↑',
+    'Divergência de Baixa: Preço ↑ RSI ↓',
+    'Divergência Oculta de Alta: Continuação bullish',
+    'Divergência Oculta de Baixa: Continuação bearish',
+])
+_PATTERN_SIGNALS = np.array([SIG_HOLD, SIG_BUY, SIG_SELL, SIG_BUY, SIG_SELL], dtype=np.int8)
+
+
+def _local_extreme(values: np.ndarray, lookback: int, is_max: bool) -> np.ndarray:
+    """
+    Máscara dos candles que são a máxima (ou mínima) da janela centrada
+    `[i - lookback, i + lookback]`.
+    
+    NaN é ignorado dentro da janela, como no `.max()`/`.min()` do pandas, e
+    um candle NaN nunca é extremo.
+    """
+    n = len(values)
+    window = 2 * lookback + 1
+    out = np.zeros(n, dtype=bool)
+    if n < window:
+        return out
+    
+    if is_max:
+        extreme = _indicators.rolling_max(np.where(np.isnan(values), -np.inf, values), window)
+    else:
+        extreme = _indicators.rolling_min(np.where(np.isnan(values), np.inf, values), window)
+    
+    # rolling(window)[i + lookback] cobre exatamente a janela centrada em i
+    out[lookback:n - lookback] = values[lookback:n - lookback] == extreme[window - 1:]
+    return out
+
+
+class _DivergenceInputs(NamedTuple):
+    """Colunas e posições de picos/vales usadas pela varredura de divergências."""
+    low: np.ndarray
+    high: np.ndarray
+    close: np.ndarray
+    rsi: np.ndarray
+    sma_trend: np.ndarray
+    volume_ratio: np.ndarray
+    macd_hist: np.ndarray
+    adx: np.ndarray
+    price_peaks: np.ndarray
+    price_valleys: np.ndarray
+    rsi_peaks: np.ndarray
+    rsi_valleys: np.ndarray
+
+
+def _last_two(positions: np.ndarray, start: np.ndarray, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Para cada `idx`, os dois últimos elementos de `positions` (ordenado) no
+    intervalo [start, idx], por busca binária.
+    
+    Returns:
+        (penúltimo, último, válido); onde há menos de dois elementos no
+        intervalo, `válido` é False e as posições são 0.
+    """
+    k = np.searchsorted(positions, idx, side='right')
+    if len(positions) < 2:
+        zeros = np.zeros(len(idx), dtype=np.intp)
+        return zeros, zeros, np.zeros(len(idx), dtype=bool)
+    first = positions[np.maximum(k - 2, 0)]
+    valid = (k >= 2) & (first >= start)
+    first = np.where(valid, first, 0)
+    last = np.where(valid, positions[np.maximum(k - 1, 0)], 0)
+    return first, last, valid
+
+
+def _pair_moves(
+    price1: np.ndarray, price2: np.ndarray,
+    rsi1: np.ndarray, rsi2: np.ndarray,
+    price_down: float, price_up: float,
+    rsi_down: float, rsi_up: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compara pares de pivôs (preço e RSI) e devolve duas máscaras: preço
+    caindo com RSI subindo, e preço subindo com RSI caindo (além dos limiares).
+    
+    Em vales, a primeira é a divergência de alta e a segunda a oculta de
+    alta; em picos, os papéis se invertem.
+    """
+    falling = (price2 < price1 * price_down) & (rsi2 > rsi1 * rsi_up)
+    rising = (price2 > price1 * price_up) & (rsi2 < rsi1 * rsi_down)
+    return falling, rising
+
+
+def _fill_nan(values: np.ndarray, default: float) -> np.ndarray:
+    """Cópia de `values` com NaN trocado por `default`."""
+    return np.where(np.isnan(values), default, values)
 
 
 class RSIDivergenceStrategy(BaseStrategy):
@@ -83,61 +174,92 @@ class RSIDivergenceStrategy(BaseStrategy):
     description = "Divergência RSI com 4 padrões (bullish, bearish, hidden)"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        # Parâmetros RSI
+        'rsi_period': 14,
+        'rsi_overbought': 70,
+        'rsi_oversold': 30,
+        
+        # Parâmetros de detecção de picos/vales
+        'lookback_periods': 20,
+        'min_peak_distance': 5,
+        'divergence_threshold': 0.02,  # 2% de diferença mínima
+        
+        # Filtros de tendência
+        'ma_trend_period': 50,
+        'min_adx': 20,
+        
+        # Confirmação de volume
+        'volume_confirmation': True,
+        'volume_multiplier': 1.2,
+        
+        # Gestão de risco
+        'atr_period': 14,
+        'sl_atr_mult': 2.0,
+        'tp_atr_mult': 4.0,
+        
+        # Qualidade mínima do sinal
+        'min_signal_strength': 0.5
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            # Parâmetros RSI
-            'rsi_period': 14,
-            'rsi_overbought': 70,
-            'rsi_oversold': 30,
-            
-            # Parâmetros de detecção de picos/vales
-            'lookback_periods': 20,
-            'min_peak_distance': 5,
-            'divergence_threshold': 0.02,  # 2% de diferença mínima
-            
-            # Filtros de tendência
-            'ma_trend_period': 50,
-            'min_adx': 20,
-            
-            # Confirmação de volume
-            'volume_confirmation': True,
-            'volume_multiplier': 1.2,
-            
-            # Gestão de risco
-            'atr_period': 14,
-            'sl_atr_mult': 2.0,
-            'tp_atr_mult': 4.0,
-            
-            # Qualidade mínima do sinal
-            'min_signal_strength': 0.5
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        # Picos/vales do último intervalo de 2*lookback exigem janelas
+        # centradas de +-lookback, sobre um RSI já completo
+        lookback = self.params['lookback_periods']
+        return max(
+            3 * lookback + wilder_warmup_bars(self.params['rsi_period']),
+            self.params['ma_trend_period'],
+            2 * self.params['min_adx'] + 1,
+            ema_warmup_bars(26) + ema_warmup_bars(9),
+            wilder_warmup_bars(self.params['atr_period'])
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calcula RSI, ATR, ADX, MACD e médias móveis.
         """
-        df = df.copy()
-        
         # RSI
-        df['rsi'] = calculate_rsi(df['close'], self.params['rsi_period'])
+        rsi = self.ctx.rsi(df['close'], self.params['rsi_period'])
         
         # ATR para gestão de risco
-        df['atr'] = calculate_atr(df, self.params['atr_period'])
+        atr = self.ctx.atr(df, self.params['atr_period'])
         
         # ADX para filtro de tendência
-        df['adx'], df['di_plus'], df['di_minus'] = calculate_adx(df, self.params['min_adx'])
+        adx, di_plus, di_minus = calculate_adx(df, self.params['min_adx'])
         
         # Médias móveis para contexto
-        df['sma_trend'] = calculate_sma(df['close'], self.params['ma_trend_period'])
-        df['ema_fast'] = calculate_ema(df['close'], 12)
-        df['ema_slow'] = calculate_ema(df['close'], 26)
+        sma_trend = self.ctx.sma(df['close'], self.params['ma_trend_period'])
+        ema_fast = self.ctx.ema(df['close'], 12)
+        ema_slow = self.ctx.ema(df['close'], 26)
         
-        # MACD para confirmação
-        df['macd'], df['macd_signal'], df['macd_hist'] = calculate_macd(df['close'])
+        # MACD para confirmação, reaproveitando as EMAs 12/26 acima
+        macd, macd_signal, macd_hist = _indicators.macd_from_emas(
+            ema_fast.to_numpy(), ema_slow.to_numpy(), 9
+        )
         
         # Médias de volume
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_sma']
+        volume_sma = self.ctx.volume_sma(df['volume'], 20)
+        volume_ratio = df['volume'] / volume_sma
+        
+        set_columns(df, {
+            'rsi': rsi,
+            'atr': atr,
+            'adx': adx,
+            'di_plus': di_plus,
+            'di_minus': di_minus,
+            'sma_trend': sma_trend,
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'volume_sma': volume_sma,
+            'volume_ratio': volume_ratio,
+        })
         
         # Detectar picos e vales
         df = self._detect_peaks_and_valleys(df)
@@ -147,199 +269,56 @@ class RSIDivergenceStrategy(BaseStrategy):
     def _detect_peaks_and_valleys(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Detecta picos e vales no preço e no RSI.
-        """
-        lookback = self.params['lookback_periods']
-        
-        df['price_peak'] = False
-        df['price_valley'] = False
-        df['rsi_peak'] = False
-        df['rsi_valley'] = False
-        
-        for i in range(lookback, len(df) - lookback):
-            # Picos de preço (máximas locais)
-            window_high = df['high'].iloc[i-lookback:i+lookback+1]
-            if df['high'].iloc[i] == window_high.max():
-                df.iloc[i, df.columns.get_loc('price_peak')] = True
-            
-            # Vales de preço (mínimas locais)
-            window_low = df['low'].iloc[i-lookback:i+lookback+1]
-            if df['low'].iloc[i] == window_low.min():
-                df.iloc[i, df.columns.get_loc('price_valley')] = True
-            
-            # Picos de RSI
-            if pd.notna(df['rsi'].iloc[i]):
-                window_rsi = df['rsi'].iloc[i-lookback:i+lookback+1]
-                if df['rsi'].iloc[i] == window_rsi.max() and df['rsi'].iloc[i] > 50:
-                    df.iloc[i, df.columns.get_loc('rsi_peak')] = True
-                
-                # Vales de RSI
-                if df['rsi'].iloc[i] == window_rsi.min() and df['rsi'].iloc[i] < 50:
-                    df.iloc[i, df.columns.get_loc('rsi_valley')] = True
         
-        return df
-    
-    def _find_divergence(self, df: pd.DataFrame, idx: int) -> Optional[DivergencePattern]:
-        """
-        Procura por divergências no ponto atual.
-        
-        Args:
-            df: DataFrame com indicadores.
-            idx: Índice atual.
-            
-        Returns:
-            DivergencePattern se encontrado, None caso contrário.
+        Um candle é pico (vale) quando é a máxima (mínima) da janela centrada
+        de +-lookback candles. As janelas vêm de uma máxima/mínima móvel
+        O(N) sobre os arrays, deslocada em `lookback` para ficar centrada;
+        os `lookback` candles de cada extremidade não têm janela completa e
+        nunca são marcados.
         """
-        if idx < self.params['lookback_periods'] * 2:
-            return None
-        
         lookback = self.params['lookback_periods']
-        threshold = self.params['divergence_threshold']
-        
-        # Buscar últimos picos/vales
-        price_data = df.iloc[idx-lookback*2:idx+1]
-        
-        current_price = df['close'].iloc[idx]
-        
-        # ====================
-        # 1. DIVERGÊNCIA DE ALTA (Bullish Divergence)
-        # ====================
-        price_valleys = price_data[price_data['price_valley']].tail(2)
-        rsi_valleys = price_data[price_data['rsi_valley']].tail(2)
-        
-        if len(price_valleys) >= 2 and len(rsi_valleys) >= 2:
-            # Preço faz lower lows
-            price_ll = price_valleys['low'].iloc[-1] < price_valleys['low'].iloc[-2] * (1 - threshold)
-            # RSI faz higher lows
-            rsi_hl = rsi_valleys['rsi'].iloc[-1] > rsi_valleys['rsi'].iloc[-2] * (1 + threshold/10)
-            
-            if price_ll and rsi_hl:
-                strength = self._calculate_divergence_strength(
-                    price_valleys['low'].iloc[-2], price_valleys['low'].iloc[-1],
-                    rsi_valleys['rsi'].iloc[-2], rsi_valleys['rsi'].iloc[-1],
-                    'bullish', df, idx
-                )
-                
-                if strength >= self.params['min_signal_strength']:
-                    return DivergencePattern(
-                        pattern_type='bullish_divergence',
-                        signal='BUY',
-                        strength=strength,
-                        price_point1=float(price_valleys['low'].iloc[-2]),
-                        price_point2=float(price_valleys['low'].iloc[-1]),
-                        rsi_point1=float(rsi_valleys['rsi'].iloc[-2]),
-                        rsi_point2=float(rsi_valleys['rsi'].iloc[-1]),
-                        index=idx,
-                        description='Divergência de Alta: Preço ↓ RSI ↑'
-                    )
-        
-        # ====================
-        # 2. DIVERGÊNCIA DE BAIXA (Bearish Divergence)
-        # ====================
-        price_peaks = price_data[price_data['price_peak']].tail(2)
-        rsi_peaks = price_data[price_data['rsi_peak']].tail(2)
-        
-        if len(price_peaks) >= 2 and len(rsi_peaks) >= 2:
-            # Preço faz higher highs
-            price_hh = price_peaks['high'].iloc[-1] > price_peaks['high'].iloc[-2] * (1 + threshold)
-            # RSI faz lower highs
-            rsi_lh = rsi_peaks['rsi'].iloc[-1] < rsi_peaks['rsi'].iloc[-2] * (1 - threshold/10)
-            
-            if price_hh and rsi_lh:
-                strength = self._calculate_divergence_strength(
-                    price_peaks['high'].iloc[-2], price_peaks['high'].iloc[-1],
-                    rsi_peaks['rsi'].iloc[-2], rsi_peaks['rsi'].iloc[-1],
-                    'bearish', df, idx
-                )
-                
-                if strength >= self.params['min_signal_strength']:
-                    return DivergencePattern(
-                        pattern_type='bearish_divergence',
-                        signal='SELL',
-                        strength=strength,
-                        price_point1=float(price_peaks['high'].iloc[-2]),
-                        price_point2=float(price_peaks['high'].iloc[-1]),
-                        rsi_point1=float(rsi_peaks['rsi'].iloc[-2]),
-                        rsi_point2=float(rsi_peaks['rsi'].iloc[-1]),
-                        index=idx,
-                        description='Divergência de Baixa: Preço ↑ RSI ↓'
-                    )
-        
-        # ====================
-        # 3. DIVERGÊNCIA OCULTA DE ALTA (Hidden Bullish)
-        # ====================
-        if len(price_valleys) >= 2 and len(rsi_valleys) >= 2:
-            # Preço faz higher lows
-            price_hl = price_valleys['low'].iloc[-1] > price_valleys['low'].iloc[-2] * (1 + threshold)
-            # RSI faz lower lows
-            rsi_ll = rsi_valleys['rsi'].iloc[-1] < rsi_valleys['rsi'].iloc[-2] * (1 - threshold/10)
-            
-            # Confirmar tendência de alta
-            trend_bullish = current_price > df['sma_trend'].iloc[idx] if pd.notna(df['sma_trend'].iloc[idx]) else False
-            
-            if price_hl and rsi_ll and trend_bullish:
-                strength = self._calculate_divergence_strength(
-                    price_valleys['low'].iloc[-2], price_valleys['low'].iloc[-1],
-                    rsi_valleys['rsi'].iloc[-2], rsi_valleys['rsi'].iloc[-1],
-                    'hidden_bullish', df, idx
-                ) * 0.9  # Hidden divergences têm menos peso
-                
-                if strength >= self.params['min_signal_strength']:
-                    return DivergencePattern(
-                        pattern_type='hidden_bullish',
-                        signal='BUY',
-                        strength=strength,
-                        price_point1=float(price_valleys['low'].iloc[-2]),
-                        price_point2=float(price_valleys['low'].iloc[-1]),
-                        rsi_point1=float(rsi_valleys['rsi'].iloc[-2]),
-                        rsi_point2=float(rsi_valleys['rsi'].iloc[-1]),
-                        index=idx,
-                        description='Divergência Oculta de Alta: Continuação bullish'
-                    )
-        
-        # ====================
-        # 4. DIVERGÊNCIA OCULTA DE BAIXA (Hidden Bearish)
-        # ====================
-        if len(price_peaks) >= 2 and len(rsi_peaks) >= 2:
-            # Preço faz lower highs
-            price_lh = price_peaks['high'].iloc[-1] < price_peaks['high'].iloc[-2] * (1 - threshold)
-            # RSI faz higher highs
-            rsi_hh = rsi_peaks['rsi'].iloc[-1] > rsi_peaks['rsi'].iloc[-2] * (1 + threshold/10)
-            
-            # Confirmar tendência de baixa
-            trend_bearish = current_price < df['sma_trend'].iloc[idx] if pd.notna(df['sma_trend'].iloc[idx]) else False
-            
-            if price_lh and rsi_hh and trend_bearish:
-                strength = self._calculate_divergence_strength(
-                    price_peaks['high'].iloc[-2], price_peaks['high'].iloc[-1],
-                    rsi_peaks['rsi'].iloc[-2], rsi_peaks['rsi'].iloc[-1],
-                    'hidden_bearish', df, idx
-                ) * 0.9
-                
-                if strength >= self.params['min_signal_strength']:
-                    return DivergencePattern(
-                        pattern_type='hidden_bearish',
-                        signal='SELL',
-                        strength=strength,
-                        price_point1=float(price_peaks['high'].iloc[-2]),
-                        price_point2=float(price_peaks['high'].iloc[-1]),
-                        rsi_point1=float(rsi_peaks['rsi'].iloc[-2]),
-                        rsi_point2=float(rsi_peaks['rsi'].iloc[-1]),
-                        index=idx,
-                        description='Divergência Oculta de Baixa: Continuação bearish'
-                    )
-        
-        return None
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        rsi = df['rsi'].to_numpy(dtype=np.float64)
+        
+        rsi_peak = _local_extreme(rsi, lookback, True) & (rsi > 50)
+        rsi_valley = _local_extreme(rsi, lookback, False) & (rsi < 50)
+        
+        return set_columns(df, {
+            'price_peak': _local_extreme(high, lookback, True),
+            'price_valley': _local_extreme(low, lookback, False),
+            'rsi_peak': rsi_peak,
+            'rsi_valley': rsi_valley,
+        })
     
-    def _calculate_divergence_strength(
+    def _divergence_inputs(self, df: pd.DataFrame) -> _DivergenceInputs:
+        """Extrai, uma única vez, os arrays usados pela varredura de divergências."""
+        return _DivergenceInputs(
+            low=df['low'].to_numpy(),
+            high=df['high'].to_numpy(),
+            close=df['close'].to_numpy(),
+            rsi=df['rsi'].to_numpy(),
+            sma_trend=df['sma_trend'].to_numpy(),
+            volume_ratio=df['volume_ratio'].to_numpy(),
+            macd_hist=df['macd_hist'].to_numpy(),
+            adx=df['adx'].to_numpy(),
+            price_peaks=np.flatnonzero(df['price_peak'].to_numpy()),
+            price_valleys=np.flatnonzero(df['price_valley'].to_numpy()),
+            rsi_peaks=np.flatnonzero(df['rsi_peak'].to_numpy()),
+            rsi_valleys=np.flatnonzero(df['rsi_valley'].to_numpy()),
+        )
+    
+    def _divergence_strength(
         self,
-        price1: float, price2: float,
-        rsi1: float, rsi2: float,
-        div_type: str,
-        df: pd.DataFrame,
-        idx: int
-    ) -> float:
+        data: _DivergenceInputs,
+        idx: np.ndarray,
+        price1: np.ndarray, price2: np.ndarray,
+        rsi1: np.ndarray, rsi2: np.ndarray,
+        bullish: bool
+    ) -> np.ndarray:
         """
-        Calcula a força da divergência baseada em múltiplos fatores.
+        Calcula a força da divergência nos candles `idx`, baseada em
+        múltiplos fatores.
         
         Componentes do score:
         - Magnitude da divergência de preço (25%)
@@ -348,128 +327,207 @@ class RSIDivergenceStrategy(BaseStrategy):
         - RSI em zona extrema (15%)
         - Confirmação MACD (15%)
         
+        Os limites são `np.minimum`/`np.clip` sem desvios: os componentes
+        só são NaN quando o preço/RSI dos picos é NaN, e aí o NaN se propaga
+        como no `min`/`max` do kernel `_numba.divergence_scan`.
+        
         Returns:
-            Score entre 0.0 e 1.0.
+            Score entre 0.0 e 1.0 por candle.
         """
-        scores = []
+        params = self.params
         
-        # 1. Magnitude da divergência de preço (25%)
-        price_change = abs(price2 - price1) / price1 if price1 > 0 else 0
-        price_score = min(price_change * 10, 1.0)
-        scores.append(('price_magnitude', price_score, 0.25))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1. Magnitude da divergência de preço (25%)
+            price_change = np.where(price1 > 0, np.abs(price2 - price1) / price1, 0.0)
+        price_score = np.minimum(np.multiply(price_change, 10, out=price_change), 1.0, out=price_change)
         
         # 2. Magnitude da divergência de RSI (25%)
-        rsi_change = abs(rsi2 - rsi1) / 100
-        rsi_score = min(rsi_change * 5, 1.0)
-        scores.append(('rsi_magnitude', rsi_score, 0.25))
+        rsi_score = np.minimum(np.abs(rsi2 - rsi1) / 100 * 5, 1.0)
         
         # 3. Confirmação de volume (20%)
-        vol_ratio = df['volume_ratio'].iloc[idx] if pd.notna(df['volume_ratio'].iloc[idx]) else 1.0
-        if self.params['volume_confirmation']:
-            volume_score = min(vol_ratio / self.params['volume_multiplier'], 1.0)
+        if params['volume_confirmation']:
+            vol_ratio = _fill_nan(data.volume_ratio[idx], 1.0)
+            volume_score = np.minimum(vol_ratio / params['volume_multiplier'], 1.0)
         else:
-            volume_score = 0.5
-        scores.append(('volume', volume_score, 0.20))
+            volume_score = np.full(len(idx), 0.5)
         
         # 4. RSI em zona extrema (15%)
-        current_rsi = df['rsi'].iloc[idx] if pd.notna(df['rsi'].iloc[idx]) else 50
-        if div_type in ['bullish', 'hidden_bullish']:
-            rsi_zone_score = max(0, (self.params['rsi_oversold'] - current_rsi + 20) / 40)
-        else:
-            rsi_zone_score = max(0, (current_rsi - self.params['rsi_overbought'] + 20) / 40)
-        rsi_zone_score = min(rsi_zone_score, 1.0)
-        scores.append(('rsi_zone', rsi_zone_score, 0.15))
-        
-        # 5. Confirmação MACD (15%)
-        macd_hist = df['macd_hist'].iloc[idx] if pd.notna(df['macd_hist'].iloc[idx]) else 0
-        macd_hist_prev = df['macd_hist'].iloc[idx-1] if idx > 0 and pd.notna(df['macd_hist'].iloc[idx-1]) else macd_hist
-        
-        if div_type in ['bullish', 'hidden_bullish']:
-            macd_score = 1.0 if macd_hist > macd_hist_prev else 0.3
+        current_rsi = _fill_nan(data.rsi[idx], 50.0)
+        if bullish:
+            rsi_zone_score = (params['rsi_oversold'] - current_rsi + 20) / 40
         else:
-            macd_score = 1.0 if macd_hist < macd_hist_prev else 0.3
-        scores.append(('macd', macd_score, 0.15))
-        
-        # Calcular score ponderado final
-        final_score = sum(score * weight for name, score, weight in scores)
-        
-        return min(max(final_score, 0.0), 1.0)
+            rsi_zone_score = (current_rsi - params['rsi_overbought'] + 20) / 40
+        np.clip(rsi_zone_score, 0.0, 1.0, out=rsi_zone_score)
+        
+        # 5. Confirmação MACD (15%): histograma subindo (alta) ou caindo (baixa)
+        macd_hist = _fill_nan(data.macd_hist[idx], 0.0)
+        macd_hist_prev = np.where(idx > 0, data.macd_hist[np.maximum(idx - 1, 0)], macd_hist)
+        macd_hist_prev = np.where(np.isnan(macd_hist_prev), macd_hist, macd_hist_prev)
+        rising = macd_hist > macd_hist_prev if bullish else macd_hist < macd_hist_prev
+        macd_score = np.where(rising, 1.0, 0.3)
+        
+        # Score ponderado final
+        final_score = price_score * 0.25
+        final_score += rsi_score * 0.25
+        final_score += volume_score * 0.20
+        final_score += rsi_zone_score * 0.15
+        final_score += macd_score * 0.15
+        
+        return np.clip(final_score, 0.0, 1.0, out=final_score)
     
-    def _apply_filters(self, df: pd.DataFrame, idx: int, divergence: DivergencePattern) -> bool:
+    def _scan_divergences(self, data: _DivergenceInputs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Aplica filtros adicionais para validar o sinal.
+        Procura divergências em todos os candles.
+        
+        Em cada candle `idx` são comparados os dois últimos picos/vales de
+        preço e de RSI dentro da janela [idx - 2*lookback, idx]; vale o
+        primeiro padrão encontrado, na ordem alta, baixa, oculta de alta e
+        oculta de baixa, com força >= `min_signal_strength`. Depois vêm os
+        filtros de ADX, volume, RSI neutro e sinal recente.
+        
+        Com Numba tudo roda no kernel `_numba.divergence_scan`. Sem ele, os
+        quatro padrões, a força e os filtros são avaliados de uma vez para
+        todos os candles com NumPy; só o filtro de sinal recente, que depende
+        dos sinais já aceitos, percorre os candidatos (poucos) em sequência.
         
         Returns:
-            True se o sinal passou em todos os filtros.
+            Códigos de sinal (SIG_*), códigos de padrão (índices de
+            `_PATTERN_TYPES`) e força, um valor por candle.
         """
-        # 1. Filtro de tendência ADX
-        adx_value = df['adx'].iloc[idx] if pd.notna(df['adx'].iloc[idx]) else 0
-        if adx_value < self.params['min_adx']:
-            logger.debug(f"Sinal filtrado: ADX muito baixo ({adx_value:.2f})")
-            return False
-        
-        # 2. Filtro de volume (se habilitado)
-        if self.params['volume_confirmation']:
-            vol_ratio = df['volume_ratio'].iloc[idx] if pd.notna(df['volume_ratio'].iloc[idx]) else 0
-            if vol_ratio < self.params['volume_multiplier']:
-                # Permitir sinais com volume normal para divergências fortes
-                if divergence.strength < 0.7:
-                    logger.debug("Sinal filtrado: Volume insuficiente")
-                    return False
-        
-        # 3. Evitar sinais consecutivos muito próximos
-        if idx >= 5:
-            recent_signals = df['signal'].iloc[idx-5:idx]
-            if (recent_signals != 'HOLD').any():
-                logger.debug("Sinal filtrado: Sinal recente muito próximo")
-                return False
-        
-        # 4. Verificar RSI não está em zona neutra demais
-        rsi = df['rsi'].iloc[idx] if pd.notna(df['rsi'].iloc[idx]) else 50
-        if 45 < rsi < 55 and divergence.strength < 0.8:
-            logger.debug(f"Sinal filtrado: RSI em zona neutra ({rsi:.2f})")
-            return False
-        
-        return True
+        params = self.params
+        lookback = params['lookback_periods']
+        if _numba.NUMBA_AVAILABLE:
+            return _numba.divergence_scan(
+                data.low, data.high, data.close, data.rsi, data.sma_trend,
+                data.volume_ratio, data.macd_hist, data.adx,
+                data.price_peaks, data.price_valleys, data.rsi_peaks, data.rsi_valleys,
+                int(lookback),
+                float(params['divergence_threshold']),
+                float(params['min_signal_strength']),
+                bool(params['volume_confirmation']),
+                float(params['volume_multiplier']),
+                float(params['rsi_oversold']),
+                float(params['rsi_overbought']),
+                float(params['min_adx'])
+            )
+        
+        n = len(data.close)
+        signal = np.full(n, SIG_HOLD, dtype=np.int8)
+        pattern = np.zeros(n, dtype=np.int8)
+        strength = np.full(n, 0.5)
+        
+        idx = np.arange(max(lookback * 2, 0), n)
+        if len(idx) == 0:
+            return signal, pattern, strength
+        
+        threshold = params['divergence_threshold']
+        min_strength = params['min_signal_strength']
+        low, high, rsi = data.low, data.high, data.rsi
+        
+        # Últimos dois picos/vales dentro da janela de cada candle
+        start = idx - lookback * 2
+        pv1, pv2, has_pv = _last_two(data.price_valleys, start, idx)
+        rv1, rv2, has_rv = _last_two(data.rsi_valleys, start, idx)
+        pp1, pp2, has_pp = _last_two(data.price_peaks, start, idx)
+        rp1, rp2, has_rp = _last_two(data.rsi_peaks, start, idx)
+        has_valleys = has_pv & has_rv
+        has_peaks = has_pp & has_rp
+        
+        current_price = data.close[idx]
+        sma_trend = data.sma_trend[idx]
+        
+        # Fatores de limiar calculados uma única vez
+        price_down, price_up = 1 - threshold, 1 + threshold
+        rsi_down, rsi_up = 1 - threshold/10, 1 + threshold/10
+        
+        # Vales: preço lower low + RSI higher low é divergência de alta; preço
+        # higher low + RSI lower low (em tendência de alta) é a oculta de alta
+        bullish, hidden_bullish = _pair_moves(
+            low[pv1], low[pv2], rsi[rv1], rsi[rv2], price_down, price_up, rsi_down, rsi_up
+        )
+        bullish &= has_valleys
+        hidden_bullish &= has_valleys & (current_price > sma_trend)
+        # Picos: os mesmos movimentos com os papéis trocados (higher high +
+        # RSI lower high é baixa; lower high + RSI higher high, em tendência
+        # de baixa, é a oculta de baixa)
+        hidden_bearish, bearish = _pair_moves(
+            high[pp1], high[pp2], rsi[rp1], rsi[rp2], price_down, price_up, rsi_down, rsi_up
+        )
+        bearish &= has_peaks
+        hidden_bearish &= has_peaks & (current_price < sma_trend)
+        
+        # Força só onde cada padrão ocorre; hidden divergences têm menos peso
+        valley_strength = self._divergence_strength(data, idx, low[pv1], low[pv2], rsi[rv1], rsi[rv2], True)
+        peak_strength = self._divergence_strength(data, idx, high[pp1], high[pp2], rsi[rp1], rsi[rp2], False)
+        candidates = [
+            (bullish, valley_strength),
+            (bearish, peak_strength),
+            (hidden_bullish, valley_strength * 0.9),
+            (hidden_bearish, peak_strength * 0.9),
+        ]
+        
+        found = np.zeros(len(idx), dtype=np.int8)
+        score = np.zeros(len(idx))
+        for code, (matched, pattern_strength) in enumerate(candidates, start=1):
+            accepted = (found == 0) & matched & (pattern_strength >= min_strength)
+            found[accepted] = code
+            score[accepted] = pattern_strength[accepted]
+        
+        # Filtros: ADX, volume (divergências fortes dispensam volume alto) e
+        # RSI fora da zona neutra
+        keep = (found != 0) & (_fill_nan(data.adx[idx], 0.0) >= params['min_adx'])
+        if params['volume_confirmation']:
+            vol_ratio = _fill_nan(data.volume_ratio[idx], 0.0)
+            keep &= ~((vol_ratio < params['volume_multiplier']) & (score < 0.7))
+        current_rsi = _fill_nan(rsi[idx], 50.0)
+        keep &= ~((current_rsi > 45) & (current_rsi < 55) & (score < 0.8))
+        
+        # Evitar sinais consecutivos: nenhum sinal aceito nos 5 candles
+        # anteriores
+        last_signal = None
+        for k in np.flatnonzero(keep).tolist():
+            i = int(idx[k])
+            if i >= 5 and last_signal is not None and i - last_signal <= 5:
+                continue
+            last_signal = i
+            pattern[i] = found[k]
+            strength[i] = score[k]
+        
+        signal[:] = _PATTERN_SIGNALS[pattern]
+        return signal, pattern, strength
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Gera sinais de compra/venda baseados em divergências RSI.
+        
+        A varredura (`_scan_divergences`) devolve arrays NumPy e cada coluna
+        é gravada uma única vez no final.
         """
-        df = df.copy()
-        
-        df['signal'] = 'HOLD'
-        df['signal_type'] = ''
-        df['signal_strength'] = 0.5
-        df['signal_reason'] = ''
-        df['stop_loss'] = np.nan
-        df['take_profit'] = np.nan
-        
-        # Processar cada candle procurando divergências
-        for i in range(self.params['lookback_periods'] * 2, len(df)):
-            divergence = self._find_divergence(df, i)
-            
-            if divergence is not None:
-                # Aplicar filtros adicionais
-                if not self._apply_filters(df, i, divergence):
-                    continue
-                
-                # Registrar sinal
-                df.iloc[i, df.columns.get_loc('signal')] = divergence.signal
-                df.iloc[i, df.columns.get_loc('signal_type')] = divergence.pattern_type
-                df.iloc[i, df.columns.get_loc('signal_strength')] = divergence.strength
-                df.iloc[i, df.columns.get_loc('signal_reason')] = divergence.description
-                
-                # Calcular Stop Loss e Take Profit
-                atr = df['atr'].iloc[i] if pd.notna(df['atr'].iloc[i]) else 0
-                entry_price = df['close'].iloc[i]
-                
-                if divergence.signal == 'BUY':
-                    df.iloc[i, df.columns.get_loc('stop_loss')] = entry_price - (atr * self.params['sl_atr_mult'])
-                    df.iloc[i, df.columns.get_loc('take_profit')] = entry_price + (atr * self.params['tp_atr_mult'])
-                else:  # SELL
-                    df.iloc[i, df.columns.get_loc('stop_loss')] = entry_price + (atr * self.params['sl_atr_mult'])
-                    df.iloc[i, df.columns.get_loc('take_profit')] = entry_price - (atr * self.params['tp_atr_mult'])
+        signal, pattern, strength = self._scan_divergences(self._divergence_inputs(df))
+        
+        # Stop Loss e Take Profit em ATR (ausente conta como 0), calculados só
+        # nos candles com sinal
+        close = df['close'].to_numpy(dtype=np.float64)
+        atr = np.nan_to_num(df['atr'].to_numpy(dtype=np.float64), nan=0.0)
+        sl_mult = self.params['sl_atr_mult']
+        tp_mult = self.params['tp_atr_mult']
+        buy_idx = np.flatnonzero(signal == SIG_BUY)
+        sell_idx = np.flatnonzero(signal == SIG_SELL)
+        
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[buy_idx] = close[buy_idx] - (atr[buy_idx] * sl_mult)
+        stop_loss[sell_idx] = close[sell_idx] + (atr[sell_idx] * sl_mult)
+        
+        take_profit = np.full(len(df), np.nan)
+        take_profit[buy_idx] = close[buy_idx] + (atr[buy_idx] * tp_mult)
+        take_profit[sell_idx] = close[sell_idx] - (atr[sell_idx] * tp_mult)
+        
+        df['signal'] = signal_column(signal)
+        df['signal_type'] = pd.Categorical.from_codes(pattern, dtype=_PATTERN_TYPES)
+        df['signal_strength'] = strength
+        df['signal_reason'] = pd.Categorical.from_codes(pattern, dtype=_PATTERN_DESCRIPTIONS)
+        df['stop_loss'] = stop_loss
+        df['take_profit'] = take_profit
         
         return df
     
@@ -495,26 +553,33 @@ class RSIDivergenceStrategy(BaseStrategy):
         """
         Retorna estatísticas dos padrões detectados.
         """
-        signals_df = df[df['signal'] != 'HOLD']
+        # Com as colunas categóricas de `generate_signals`, cada comparação é
+        # feita sobre os códigos int8
+        signal = df['signal']
+        signals_df = df[(signal != 'HOLD').to_numpy()]
         
         if len(signals_df) == 0:
             return {'total_patterns': 0}
         
+        signal = signals_df['signal']
+        strength = signals_df['signal_strength'].to_numpy()
         stats = {
             'total_patterns': len(signals_df),
-            'buy_signals': len(signals_df[signals_df['signal'] == 'BUY']),
-            'sell_signals': len(signals_df[signals_df['signal'] == 'SELL']),
-            'avg_strength': float(signals_df['signal_strength'].mean()),
+            'buy_signals': int((signal == 'BUY').sum()),
+            'sell_signals': int((signal == 'SELL').sum()),
+            'avg_strength': float(strength.mean()),
             'pattern_distribution': {}
         }
         
-        for pattern_type in signals_df['signal_type'].unique():
+        signal_type = signals_df['signal_type']
+        for pattern_type in signal_type.unique():
             if pattern_type:
-                count = len(signals_df[signals_df['signal_type'] == pattern_type])
+                matched = (signal_type == pattern_type).to_numpy()
+                count = int(matched.sum())
                 stats['pattern_distribution'][pattern_type] = {
                     'count': count,
                     'percentage': (count / len(signals_df)) * 100,
-                    'avg_strength': float(signals_df[signals_df['signal_type'] == pattern_type]['signal_strength'].mean())
+                    'avg_strength': float(strength[matched].mean())
                 }
         
         return stats
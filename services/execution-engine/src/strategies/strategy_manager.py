@@ -10,18 +10,40 @@ Funcionalidades:
 - Recomendação de estratégias por condição de mercado
 """
 
-from typing import Dict, Any, List, Type, Optional
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Type, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
-from .base_strategy import BaseStrategy
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .base_strategy import BaseStrategy, MIN_DATA_ROWS, fingerprint, signal_direction, wilder_warmup_bars
 from .trend_following import TrendFollowingStrategy
 from .mean_reversion import MeanReversionStrategy
 from .breakout import BreakoutStrategy
 from .macd_crossover import MACDCrossoverStrategy
 from .rsi_divergence import RSIDivergenceStrategy
 from .dynamic_position_sizing import DynamicPositionSizingStrategy
+from .indicator_cache import IndicatorCache
+
+
+# Espaços e hífens nos nomes de estratégia viram '_' (tabela montada uma vez)
+_NAME_TRANSLATION = str.maketrans({' ': '_', '-': '_'})
+
+
+def _normalize_name(strategy_name: str) -> str:
+    """Chave de registro de um nome de estratégia (case insensitive)."""
+    return strategy_name.lower().translate(_NAME_TRANSLATION)
 
 
 class StrategyManager:
@@ -93,16 +115,33 @@ class StrategyManager:
             Risk/Reward: Baixo/Médio (foco em preservação)
         """
     }
+    # Sem as quebras de linha e a indentação das aspas triplas nas pontas,
+    # calculado uma única vez na importação
+    STRATEGY_DESCRIPTIONS = {key: text.strip() for key, text in STRATEGY_DESCRIPTIONS.items()}
+    
+    # Instâncias já criadas, por (estratégia, parâmetros congelados), em LRU
+    # limitado: otimizações de parâmetros (walk-forward/optuna) chamam
+    # `get_strategy` com um conjunto novo a cada trial
+    _cache: "OrderedDict[Tuple[str, Optional[Tuple]], BaseStrategy]" = OrderedDict()
+    _CACHE_SIZE = 32
+    _cache_lock = threading.Lock()
+    
+    # Resultado de `list_strategies`, montado na primeira chamada
+    _listing: Optional[List[Dict[str, Any]]] = None
     
     def __init__(self):
         """Inicializa o gerenciador de estratégias."""
-        self._cache: Dict[str, BaseStrategy] = {}
         logger.info(f"StrategyManager inicializado com {len(self.STRATEGIES)} estratégias")
     
     @classmethod
     def get_strategy(cls, strategy_name: str, params: Optional[Dict[str, Any]] = None) -> BaseStrategy:
         """
-        Cria instância de uma estratégia pelo nome.
+        Retorna instância de uma estratégia pelo nome.
+        
+        Instâncias são reaproveitadas entre chamadas com o mesmo nome e os
+        mesmos parâmetros (LRU de `_CACHE_SIZE` entradas). O estado de cada
+        instância se limita a memos internos (métricas do último resultado,
+        último sinal), que não alteram o resultado de `run()`.
         
         Args:
             strategy_name: Nome da estratégia (case insensitive).
@@ -114,45 +153,82 @@ class StrategyManager:
         Raises:
             ValueError: Se estratégia não existe.
         """
-        strategy_key = strategy_name.lower().replace(' ', '_').replace('-', '_')
+        strategy_key = _normalize_name(strategy_name)
+        strategy_class = cls.STRATEGIES.get(strategy_key)
         
-        if strategy_key not in cls.STRATEGIES:
+        if strategy_class is None:
             available = ', '.join(cls.STRATEGIES.keys())
             raise ValueError(
                 f"Estratégia '{strategy_name}' não encontrada. "
                 f"Disponíveis: {available}"
             )
         
-        strategy_class = cls.STRATEGIES[strategy_key]
-        return strategy_class(params)
+        try:
+            cache_key = (strategy_key, tuple(sorted(params.items())) if params else None)
+            hash(cache_key)
+        except TypeError:
+            # Parâmetros não hasheáveis (ex.: listas): instância avulsa
+            return strategy_class(params)
+        
+        with cls._cache_lock:
+            strategy = cls._cache.get(cache_key)
+            if strategy is not None:
+                cls._cache.move_to_end(cache_key)
+                return strategy
+        
+        strategy = strategy_class(params)
+        with cls._cache_lock:
+            # Outra thread pode ter criado a mesma instância nesse meio tempo
+            strategy = cls._cache.setdefault(cache_key, strategy)
+            cls._cache.move_to_end(cache_key)
+            if len(cls._cache) > cls._CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        
+        return strategy
     
     @classmethod
     def list_strategies(cls) -> List[Dict[str, Any]]:
         """
         Lista todas as estratégias disponíveis com suas descrições.
         
+        As informações dependem só das classes registradas e dos parâmetros
+        padrão, então são montadas uma única vez; cada chamada devolve cópias
+        dos dicionários e listas, que o chamador pode alterar.
+        
         Returns:
             Lista de dicionários com info das estratégias.
         """
-        strategies_info = []
+        if cls._listing is None:
+            cls._listing = [cls._strategy_info(key) for key in cls.STRATEGIES]
         
-        for key, strategy_class in cls.STRATEGIES.items():
-            # Criar instância temporária para obter informações
-            temp_instance = strategy_class()
-            
-            strategies_info.append({
-                'id': key,
-                'name': temp_instance.name,
-                'description': temp_instance.description,
-                'version': temp_instance.version,
-                'class': strategy_class.__name__,
-                'default_parameters': temp_instance.params,
-                'entry_conditions': temp_instance.get_entry_conditions(),
-                'exit_conditions': temp_instance.get_exit_conditions(),
-                'long_description': cls.STRATEGY_DESCRIPTIONS.get(key, '').strip()
-            })
-        
-        return strategies_info
+        # Os textos são imutáveis; só os dicionários e listas são copiados
+        return [
+            dict(
+                info,
+                default_parameters=dict(info['default_parameters']),
+                entry_conditions=list(info['entry_conditions']),
+                exit_conditions=list(info['exit_conditions'])
+            )
+            for info in cls._listing
+        ]
+    
+    @classmethod
+    def _strategy_info(cls, key: str) -> Dict[str, Any]:
+        """Informações de uma estratégia registrada, com parâmetros padrão."""
+        # Instância com parâmetros padrão (reaproveitada do cache)
+        default_instance = cls.get_strategy(key)
+        
+        return {
+            'id': key,
+            'name': default_instance.name,
+            'description': default_instance.description,
+            'version': default_instance.version,
+            'class': cls.STRATEGIES[key].__name__,
+            'default_parameters': dict(default_instance.params),
+            'entry_conditions': default_instance.get_entry_conditions(),
+            'exit_conditions': default_instance.get_exit_conditions(),
+            'long_description': cls.STRATEGY_DESCRIPTIONS.get(key, '')
+        }
     
     @classmethod
     def get_strategy_class(cls, strategy_name: str) -> Type[BaseStrategy]:
@@ -165,13 +241,13 @@ class StrategyManager:
         Returns:
             Classe da estratégia.
         """
-        strategy_key = strategy_name.lower().replace(' ', '_').replace('-', '_')
+        strategy_class = cls.STRATEGIES.get(_normalize_name(strategy_name))
         
-        if strategy_key not in cls.STRATEGIES:
+        if strategy_class is None:
             available = ', '.join(cls.STRATEGIES.keys())
             raise ValueError(f"Estratégia '{strategy_name}' não encontrada. Disponíveis: {available}")
         
-        return cls.STRATEGIES[strategy_key]
+        return strategy_class
     
     @classmethod
     def get_strategy_description(cls, strategy_name: str) -> Dict[str, Any]:
@@ -185,18 +261,55 @@ class StrategyManager:
             Dicionário com descrição detalhada.
         """
         strategy = cls.get_strategy(strategy_name)
-        strategy_key = strategy_name.lower().replace(' ', '_').replace('-', '_')
+        strategy_key = _normalize_name(strategy_name)
         
         return {
             'name': strategy.name,
             'description': strategy.description,
             'version': strategy.version,
-            'parameters': strategy.params,
+            'parameters': dict(strategy.params),
             'entry_conditions': strategy.get_entry_conditions(),
             'exit_conditions': strategy.get_exit_conditions(),
-            'long_description': cls.STRATEGY_DESCRIPTIONS.get(strategy_key, '').strip()
+            'long_description': cls.STRATEGY_DESCRIPTIONS.get(strategy_key, '')
         }
     
+    @classmethod
+    def _compare_single(cls, strategy_name: str, df: pd.DataFrame, ctx: IndicatorCache) -> Dict[str, Any]:
+        """Executa uma estratégia e calcula suas métricas para `compare_strategies`."""
+        try:
+            # Instância própria da comparação, ligada ao cache da varredura
+            strategy = cls.get_strategy_class(strategy_name)(ctx=ctx)
+            # `run()` já trabalha sobre uma cópia rasa: os dados OHLCV de `df`
+            # são compartilhados entre as estratégias, sem cópia por tarefa
+            df_result = strategy.run(df)
+            
+            # Calcular métricas
+            sharpe = strategy.calculate_sharpe_ratio(df_result)
+            max_dd = strategy.calculate_max_drawdown(df_result)
+            
+            # Contar sinais
+            direction = signal_direction(df_result['signal'])
+            total_trades = int(np.count_nonzero(direction))
+            
+            # Retorno total composto, calculado sobre arrays NumPy junto com
+            # as demais métricas
+            total_return = strategy.calculate_total_return(df_result)
+            
+            return {
+                'sharpe_ratio': round(float(sharpe), 2),
+                'max_drawdown': round(float(max_dd * 100), 2),  # em percentual
+                'total_return': round(float(total_return * 100), 2),  # em percentual
+                'total_trades': int(total_trades),
+                'status': 'success'
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao comparar estratégia {strategy_name}: {e}")
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
     @classmethod
     def compare_strategies(
         cls, 
@@ -213,49 +326,31 @@ class StrategyManager:
             initial_capital: Capital inicial para simulação.
             
         Returns:
-            Comparação de performances.
+            Comparação de performances. Com menos de `MIN_DATA_ROWS` candles,
+            nenhuma estratégia roda e todas vêm com status 'skipped'.
         """
-        results = {}
-        
-        for strategy_name in strategies:
-            try:
-                strategy = cls.get_strategy(strategy_name)
-                df_result = strategy.run(df.copy())
-                
-                # Calcular métricas
-                sharpe = strategy.calculate_sharpe_ratio(df_result)
-                max_dd = strategy.calculate_max_drawdown(df_result)
-                
-                # Contar sinais
-                signals_df = df_result[df_result['signal'] != 'HOLD'] if df_result['signal'].dtype == object else df_result[df_result['signal'] != 0]
-                total_trades = len(signals_df)
-                
-                # Calcular retorno total
-                df_result['returns'] = df_result['close'].pct_change()
-                
-                if df_result['signal'].dtype == object:
-                    signal_map = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
-                    df_result['signal_num'] = df_result['signal'].map(signal_map).fillna(0)
-                else:
-                    df_result['signal_num'] = df_result['signal']
-                
-                df_result['strategy_returns'] = df_result['returns'] * df_result['signal_num'].shift(1)
-                total_return = (1 + df_result['strategy_returns'].fillna(0)).prod() - 1
-                
-                results[strategy_name] = {
-                    'sharpe_ratio': round(float(sharpe), 2),
-                    'max_drawdown': round(float(max_dd * 100), 2),  # em percentual
-                    'total_return': round(float(total_return * 100), 2),  # em percentual
-                    'total_trades': int(total_trades),
-                    'status': 'success'
-                }
-                
-            except Exception as e:
-                logger.error(f"Erro ao comparar estratégia {strategy_name}: {e}")
-                results[strategy_name] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        # Abaixo do mínimo de `validate_data` todas as estratégias falhariam:
+        # nenhuma é executada
+        if len(df) < MIN_DATA_ROWS:
+            message = f"Dados insuficientes: {len(df)} linhas (mínimo: {MIN_DATA_ROWS})"
+            logger.warning(f"compare_strategies ignorado - {message}")
+            return {
+                strategy_name: {'status': 'skipped', 'error': message}
+                for strategy_name in strategies
+            }
+        
+        # As estratégias são independentes: cada uma roda em uma thread sobre o
+        # mesmo DataFrame, como em `BaseStrategy.run_many` (kernels sem GIL).
+        # Um cache de indicadores só desta varredura evita recalcular RSI,
+        # ATR, EMAs etc. em cada estratégia e é descartado ao final
+        ctx = IndicatorCache()
+        if len(strategies) <= 1:
+            outcomes = [cls._compare_single(name, df, ctx) for name in strategies]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(strategies), os.cpu_count() or 1)) as executor:
+                outcomes = list(executor.map(lambda name: cls._compare_single(name, df, ctx), strategies))
+        
+        results = dict(zip(strategies, outcomes))
         
         # Ranking
         successful = {k: v for k, v in results.items() if v.get('status') == 'success'}
@@ -276,7 +371,8 @@ class StrategyManager:
         self, 
         strategy_name: str, 
         data: List[Dict], 
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        realtime: bool = False
     ) -> Dict:
         """
         Gera sinal para dados fornecidos (compatibilidade com versão anterior).
@@ -285,26 +381,89 @@ class StrategyManager:
             strategy_name: Nome da estratégia.
             data: Lista de dicionários com dados OHLCV.
             params: Parâmetros customizados.
+            realtime: Se True, calcula apenas sobre os últimos
+                `strategy.min_required_bars` candles, já que só o sinal do
+                último candle é usado. Não usar quando a série completa de
+                indicadores for necessária (ex.: backtests). Num candle HOLD,
+                o SL/TP herdado do último sinal (preenchimento de `run()`)
+                passa a considerar só os sinais dentro dessa janela.
             
         Returns:
             Dicionário com informações do sinal.
+        
+        O cálculo (montagem do DataFrame, indicadores e sinal) é CPU-bound e
+        roda numa thread do executor padrão, para não bloquear o event loop
+        e permitir que vários símbolos sejam processados em paralelo.
         """
-        df = pd.DataFrame(data)
+        return await asyncio.to_thread(self._generate_signal_sync, strategy_name, data, params, realtime)
+    
+    def _generate_signal_sync(
+        self,
+        strategy_name: str,
+        data: List[Dict],
+        params: Optional[Dict] = None,
+        realtime: bool = False
+    ) -> Dict:
+        """Implementação síncrona de `generate_signal`."""
+        raw = _records_to_frame(data)
         
-        # Garantir tipos corretos
-        for col in ["open", "high", "low", "close"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+        # Garantir tipos corretos: OHLC vira um único bloco float64 em ordem
+        # de coluna (Fortran), então cada coluna é um buffer contíguo que os
+        # kernels de indicadores leem sem cópia adicional
+        price_cols = [col for col in ("open", "high", "low", "close") if col in raw.columns]
+        prices = np.asfortranarray(np.column_stack([
+            pd.to_numeric(raw[col], errors="coerce").to_numpy(dtype=np.float64)
+            for col in price_cols
+        ])) if price_cols else np.empty((len(raw), 0))
+        df = pd.DataFrame(prices, columns=price_cols, index=raw.index, copy=False)
+        for loc, col in enumerate(raw.columns):
+            if col not in price_cols:
+                df.insert(loc, col, raw[col])
         
+        # Volume em int32 quando todos os valores cabem (o caso normal); se
+        # algum não couber, fica em int64. Nunca um inteiro menor: int8/int16
+        # estourariam em aritmética no dtype nativo (ex.: `volume * k`)
         if "volume" in df.columns:
-            df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0).astype(int)
+            volume = pd.to_numeric(df["volume"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+            bounds = np.iinfo(np.int32)
+            if len(volume) and bounds.min <= volume.min() and volume.max() <= bounds.max:
+                volume = volume.astype(np.int32)
+            df["volume"] = volume
         
         strategy = self.get_strategy(strategy_name, params)
+        
+        # Tempo real: custo independe do tamanho do histórico enviado
+        if realtime and strategy.min_required_bars is not None:
+            df = df.iloc[-max(strategy.min_required_bars, MIN_DATA_ROWS):]
+        
         signal = strategy.get_current_signal(df)
         
         return signal.to_dict()
 
 
+def _records_to_frame(data: List[Dict]) -> pd.DataFrame:
+    """
+    Converte a lista de candles (dicts) em DataFrame.
+    
+    Com pyarrow, monta os buffers coluna a coluna em C e infere um tipo por
+    coluna, em vez de inferir célula a célula como `pd.DataFrame(data)`. O
+    resultado segue a semântica do pandas: colunas na ordem em que aparecem
+    nos registros, chaves ausentes como nulos e datas em nanossegundos.
+    Registros com tipos mistos numa mesma coluna (ex.: número e string) não
+    são representáveis no Arrow e caem no construtor do pandas.
+    """
+    if PYARROW_AVAILABLE and data:
+        try:
+            batch = pa.RecordBatch.from_struct_array(pa.array(data))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            return pd.DataFrame(data)
+        columns = list(dict.fromkeys(key for record in data for key in record))
+        return batch.select(columns).to_pandas(
+            split_blocks=True, self_destruct=True, coerce_temporal_nanoseconds=True
+        )
+    return pd.DataFrame(data)
+
+
 def get_recommended_strategy(market_condition: str) -> List[str]:
     """
     Recomenda estratégias baseado nas condições de mercado.
@@ -334,6 +493,16 @@ def get_recommended_strategy(market_condition: str) -> List[str]:
     return recommendations.get(market_condition.lower(), ['macd_crossover', 'trend_following'])
 
 
+# Regimes já classificados, pelo digest de high/low/close (política LRU)
+_REGIME_CACHE: "OrderedDict[Tuple, str]" = OrderedDict()
+_REGIME_CACHE_SIZE = 256
+_regime_lock = threading.Lock()
+
+# Candles usados na classificação: SMA50, ADX(14) sobre médias de 14 e o
+# aquecimento da suavização de Wilder do ATR(14)
+_REGIME_BARS = max(50, 2 * 14, wilder_warmup_bars(14)) + 1
+
+
 def detect_market_regime(df: pd.DataFrame) -> str:
     """
     Detecta o regime de mercado atual (PASSO 8 do plano).
@@ -344,6 +513,11 @@ def detect_market_regime(df: pd.DataFrame) -> str:
     - ranging: ADX < 20
     - volatile: ATR% > 3%
     
+    Os indicadores são calculados só sobre os últimos `_REGIME_BARS`
+    candles, e o resultado fica memorizado pelo digest (`fingerprint`) das
+    colunas high/low/close dessa cauda, então chamadas repetidas com os
+    mesmos candles não recalculam os indicadores.
+    
     Args:
         df: DataFrame com dados OHLCV.
         
@@ -353,23 +527,42 @@ def detect_market_regime(df: pd.DataFrame) -> str:
     if len(df) < 50:
         return 'unknown'
     
-    df = df.copy()
+    # Só o último candle é classificado: basta a cauda que cobre as janelas
+    # (SMA50, ADX) e o aquecimento do ATR
+    df = df.tail(_REGIME_BARS)
     
-    # Calcular indicadores
+    key = fingerprint(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy())
+    with _regime_lock:
+        regime = _REGIME_CACHE.get(key)
+        if regime is not None:
+            _REGIME_CACHE.move_to_end(key)
+            return regime
+    
+    regime = _classify_regime(df)
+    with _regime_lock:
+        _REGIME_CACHE[key] = regime
+        if len(_REGIME_CACHE) > _REGIME_CACHE_SIZE:
+            _REGIME_CACHE.popitem(last=False)
+    return regime
+
+
+def _classify_regime(df: pd.DataFrame) -> str:
+    """Calcula ADX, ATR% e SMA50 e classifica o último candle."""
     from .base_strategy import calculate_adx, calculate_atr, calculate_sma
     
-    df['adx'], _, _ = calculate_adx(df, 14)
-    df['atr'] = calculate_atr(df, 14)
-    df['sma50'] = calculate_sma(df['close'], 50)
-    df['atr_pct'] = (df['atr'] / df['close']) * 100
+    adx_series, _, _ = calculate_adx(df, 14)
+    atr_pct_series = (calculate_atr(df, 14) / df['close']) * 100
+    sma50_series = calculate_sma(df['close'], 50)
     
     # Últimos valores
-    last = df.iloc[-1]
+    adx = adx_series.iloc[-1]
+    atr_pct = atr_pct_series.iloc[-1]
+    close = df['close'].iloc[-1]
+    sma50 = sma50_series.iloc[-1]
     
-    adx = last['adx'] if pd.notna(last['adx']) else 0
-    atr_pct = last['atr_pct'] if pd.notna(last['atr_pct']) else 0
-    close = last['close']
-    sma50 = last['sma50'] if pd.notna(last['sma50']) else close
+    adx = adx if pd.notna(adx) else 0
+    atr_pct = atr_pct if pd.notna(atr_pct) else 0
+    sma50 = sma50 if pd.notna(sma50) else close
     
     # Classificar regime
     if atr_pct > 3.0:
@@ -15,11 +15,25 @@ from typing import Dict, List
 import pandas as pd
 import numpy as np
 
+from . import _indicators
 from .base_strategy import (
     BaseStrategy,
-    calculate_atr,
-    calculate_rsi,
-    calculate_ema
+    SIG_BUY,
+    SIG_HOLD,
+    SIG_SELL,
+    ema_warmup_bars,
+    wilder_warmup_bars,
+    reason_column,
+    reason_dtype,
+    set_columns,
+    signal_column
+)
+
+
+# Motivos indexados pelos códigos de sinal (HOLD, BUY, SELL)
+_REASON_DTYPE = reason_dtype(
+    "EMA crossover bullish + Volume alto",
+    "EMA crossover bearish + Volume alto"
 )
 
 
@@ -35,95 +49,117 @@ class TrendFollowingStrategy(BaseStrategy):
     description = "Seguidor de tendência com EMA 9/21 + RSI + Volume"
     version = "2.0.0"
     
+    _DEFAULT_PARAMS: Dict = {
+        "ema_fast": 9,
+        "ema_slow": 21,
+        "rsi_period": 14,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "volume_mult": 1.2,
+        "atr_period": 14,
+        "sl_atr_mult": 2.0,
+        "tp_atr_mult": 3.0
+    }
+    
     def default_params(self) -> Dict:
-        return {
-            "ema_fast": 9,
-            "ema_slow": 21,
-            "rsi_period": 14,
-            "rsi_oversold": 30,
-            "rsi_overbought": 70,
-            "volume_mult": 1.2,
-            "atr_period": 14,
-            "sl_atr_mult": 2.0,
-            "tp_atr_mult": 3.0
-        }
+        return self._DEFAULT_PARAMS.copy()
+    
+    @property
+    def min_required_bars(self) -> int:
+        return max(
+            ema_warmup_bars(self.params["ema_slow"]),
+            wilder_warmup_bars(self.params["rsi_period"]),
+            wilder_warmup_bars(self.params["atr_period"]),
+            20
+        ) + 5
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        
         # EMAs
-        df["ema_fast"] = calculate_ema(df["close"], self.params["ema_fast"])
-        df["ema_slow"] = calculate_ema(df["close"], self.params["ema_slow"])
+        ema_fast = self.ctx.ema(df["close"], self.params["ema_fast"])
+        ema_slow = self.ctx.ema(df["close"], self.params["ema_slow"])
         
         # RSI
-        df["rsi"] = calculate_rsi(df["close"], self.params["rsi_period"])
+        rsi = self.ctx.rsi(df["close"], self.params["rsi_period"])
         
         # ATR
-        df["atr"] = calculate_atr(df, self.params["atr_period"])
+        atr = self.ctx.atr(df, self.params["atr_period"])
         
         # Volume SMA
-        df["volume_sma"] = df["volume"].rolling(window=20).mean()
-        df["volume_ratio"] = df["volume"] / df["volume_sma"]
+        volume_sma = self.ctx.volume_sma(df["volume"], 20)
         
-        # Tendência
-        df["trend"] = np.where(df["ema_fast"] > df["ema_slow"], 1, -1)
+        # Razão de volume e tendência direto sobre os arrays, sem Series
+        # intermediárias
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volume_ratio = np.divide(
+                df["volume"].to_numpy(dtype=np.float64),
+                volume_sma.to_numpy(dtype=np.float64)
+            )
+        trend = np.where(ema_fast.to_numpy() > ema_slow.to_numpy(), 1, -1).astype(np.int8)
         
-        return df
+        return set_columns(df, {
+            "ema_fast": ema_fast,
+            "ema_slow": ema_slow,
+            "rsi": rsi,
+            "atr": atr,
+            "volume_sma": volume_sma,
+            "volume_ratio": volume_ratio,
+            "trend": trend,
+        })
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df["signal"] = "HOLD"
-        df["signal_strength"] = 0.5
-        df["signal_reason"] = ""
+        ema_fast = df["ema_fast"].to_numpy()
+        ema_slow = df["ema_slow"].to_numpy()
+        rsi = df["rsi"].to_numpy()
+        high_volume = df["volume_ratio"].to_numpy() > self.params["volume_mult"]
         
         # Condições de compra
         buy_condition = (
-            (df["ema_fast"] > df["ema_slow"]) &
-            (df["ema_fast"].shift(1) <= df["ema_slow"].shift(1)) &
-            (df["rsi"] < self.params["rsi_overbought"]) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+            _indicators.crossed_above(ema_fast, ema_slow) &
+            (rsi < self.params["rsi_overbought"]) &
+            high_volume
         )
         
         # Condições de venda
         sell_condition = (
-            (df["ema_fast"] < df["ema_slow"]) &
-            (df["ema_fast"].shift(1) >= df["ema_slow"].shift(1)) &
-            (df["rsi"] > self.params["rsi_oversold"]) &
-            (df["volume_ratio"] > self.params["volume_mult"])
+            _indicators.crossed_below(ema_fast, ema_slow) &
+            (rsi > self.params["rsi_oversold"]) &
+            high_volume
         )
         
-        df.loc[buy_condition, "signal"] = "BUY"
-        df.loc[buy_condition, "signal_reason"] = "EMA crossover bullish + Volume alto"
+        # Máscaras convertidas uma única vez em índices posicionais
+        buy_idx = np.flatnonzero(buy_condition)
+        sell_idx = np.flatnonzero(sell_condition)
         
-        df.loc[sell_condition, "signal"] = "SELL"
-        df.loc[sell_condition, "signal_reason"] = "EMA crossover bearish + Volume alto"
+        signal = np.full(len(df), SIG_HOLD, dtype=np.int8)
+        signal[buy_idx] = SIG_BUY
+        signal[sell_idx] = SIG_SELL
         
         # Força do sinal baseada em RSI
-        df.loc[buy_condition, "signal_strength"] = 0.5 + (50 - df.loc[buy_condition, "rsi"]) / 100
-        df.loc[sell_condition, "signal_strength"] = 0.5 + (df.loc[sell_condition, "rsi"] - 50) / 100
+        strength = np.full(len(df), 0.5)
+        strength[buy_idx] = 0.5 + (50 - rsi[buy_idx]) / 100
+        strength[sell_idx] = 0.5 + (rsi[sell_idx] - 50) / 100
         
-        # Stop Loss e Take Profit
-        df["stop_loss"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] - (df["atr"] * self.params["sl_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] + (df["atr"] * self.params["sl_atr_mult"]),
-                np.nan
-            )
-        )
+        # Stop Loss e Take Profit em ATR, calculados só nos candles com sinal
+        close = df["close"].to_numpy()
+        atr = df["atr"].to_numpy()
+        sl_mult = self.params["sl_atr_mult"]
+        tp_mult = self.params["tp_atr_mult"]
         
-        df["take_profit"] = np.where(
-            df["signal"] == "BUY",
-            df["close"] + (df["atr"] * self.params["tp_atr_mult"]),
-            np.where(
-                df["signal"] == "SELL",
-                df["close"] - (df["atr"] * self.params["tp_atr_mult"]),
-                np.nan
-            )
-        )
+        stop_loss = np.full(len(df), np.nan)
+        stop_loss[buy_idx] = close[buy_idx] - atr[buy_idx] * sl_mult
+        stop_loss[sell_idx] = close[sell_idx] + atr[sell_idx] * sl_mult
+        
+        take_profit = np.full(len(df), np.nan)
+        take_profit[buy_idx] = close[buy_idx] + atr[buy_idx] * tp_mult
+        take_profit[sell_idx] = close[sell_idx] - atr[sell_idx] * tp_mult
         
-        return df
+        return set_columns(df, {
+            "signal": signal_column(signal),
+            "signal_strength": strength,
+            "signal_reason": reason_column(signal, _REASON_DTYPE),
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+        })
     
     def get_entry_conditions(self) -> List[str]:
         return [
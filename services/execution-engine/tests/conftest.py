@@ -0,0 +1,58 @@
+"""
+Fixtures compartilhadas dos testes do execution-engine.
+
+Os testes importam o pacote `strategies` diretamente de `src/`, sem passar
+por `src/__init__`, que depende do asyncpg.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+def make_ohlcv(n: int = 600, seed: int = 0) -> pd.DataFrame:
+    """Candles sintéticos (passeio aleatório log-normal) com volume inteiro."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = close * (1 - np.abs(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    volume = rng.integers(1_000, 100_000, n)
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+    })
+
+
+def with_gaps(values: np.ndarray) -> np.ndarray:
+    """Cópia float64 com um bloco de NaN no meio da série."""
+    values = values.astype(np.float64)
+    values[100:103] = np.nan
+    return values
+
+
+@pytest.fixture
+def ohlcv() -> pd.DataFrame:
+    return make_ohlcv()
+
+
+@pytest.fixture(params=["numba", "fallback"])
+def engine(request, monkeypatch) -> str:
+    """
+    Roda o teste com os kernels Numba e com o fallback NumPy/pandas
+    (sem Numba e sem bottleneck).
+    """
+    from strategies import _indicators, _numba
+    if request.param == "numba" and not _numba.NUMBA_AVAILABLE:
+        pytest.skip("numba não instalado")
+    if request.param == "fallback":
+        monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+        monkeypatch.setattr(_indicators, "BOTTLENECK_AVAILABLE", False)
+    return request.param
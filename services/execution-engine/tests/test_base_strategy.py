@@ -0,0 +1,76 @@
+"""Testes do pipeline comum de `BaseStrategy`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.trend_following import TrendFollowingStrategy
+
+from conftest import make_ohlcv
+
+
+@pytest.fixture
+def counted_strategy(monkeypatch):
+    """Estratégia cujas execuções de `run()` são contadas."""
+    strategy = TrendFollowingStrategy()
+    strategy.runs = 0
+    run = strategy.run
+    
+    def counting(df):
+        strategy.runs += 1
+        return run(df)
+    
+    monkeypatch.setattr(strategy, "run", counting)
+    return strategy
+
+
+def test_current_signal_memo_hits_on_same_window(counted_strategy):
+    df = make_ohlcv(300)
+    
+    first = counted_strategy.get_current_signal(df)
+    second = counted_strategy.get_current_signal(df.copy())
+    
+    assert counted_strategy.runs == 1
+    assert second == first
+    assert second.indicators is not first.indicators
+
+
+def test_current_signal_memo_invalidated_by_middle_row(counted_strategy):
+    df = make_ohlcv(300)
+    counted_strategy.get_current_signal(df)
+    
+    revised = df.copy()
+    revised.loc[100:298, ["open", "high", "low", "close"]] *= 0.6
+    signal = counted_strategy.get_current_signal(revised)
+    
+    assert counted_strategy.runs == 2
+    assert signal == TrendFollowingStrategy().get_current_signal(revised)
+
+
+def test_current_signal_memo_hits_with_nan_in_last_row(counted_strategy):
+    df = make_ohlcv(300)
+    df.loc[df.index[-1], "open"] = np.nan
+    
+    counted_strategy.get_current_signal(df)
+    counted_strategy.get_current_signal(df.copy())
+    
+    assert counted_strategy.runs == 1
+
+
+def test_run_keeps_warmup_nan_and_fills_signal_columns_forward_only(ohlcv):
+    original = ohlcv.copy()
+    result = TrendFollowingStrategy().run(ohlcv)
+    
+    # Indicadores mantêm o NaN do aquecimento em vez de receber valores futuros
+    assert result["rsi"].iloc[:14].isna().all()
+    assert result["atr"].iloc[:13].isna().all()
+    
+    # Stop/alvo: NaN antes do primeiro sinal, depois o valor do último sinal
+    signaled = np.flatnonzero(result["signal"].astype(str).to_numpy() != "HOLD")
+    assert len(signaled) > 0
+    first = signaled[0]
+    assert result["stop_loss"].iloc[:first].isna().all()
+    expected = result["stop_loss"].where(result["signal"].astype(str) != "HOLD").ffill()
+    np.testing.assert_array_equal(result["stop_loss"].to_numpy(), expected.to_numpy())
+    
+    pd.testing.assert_frame_equal(ohlcv, original)
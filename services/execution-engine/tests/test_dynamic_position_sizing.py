@@ -0,0 +1,42 @@
+"""Testes da análise de risco da `DynamicPositionSizingStrategy`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.dynamic_position_sizing import DynamicPositionSizingStrategy
+
+
+def test_analyze_risk_batch_matches_row_wise(ohlcv):
+    strategy = DynamicPositionSizingStrategy()
+    result = strategy.run(ohlcv)
+    # Candle sem distância até o stop: risk/reward protegido
+    result.loc[result.index[-2], "stop_loss"] = result["close"].iat[-2]
+    
+    batch = strategy.analyze_risk_batch(result, account_balance=25_000.0)
+    
+    assert batch.index.equals(result.index)
+    for i in range(0, len(result), 7):
+        row = strategy.analyze_risk(result.iloc[:i + 1], account_balance=25_000.0)
+        got = batch.iloc[i]
+        for key, expected in row.items():
+            if key == "account_balance":
+                continue
+            if key == "volatility_level":
+                assert got[key] == expected, (i, key)
+            elif expected is None:
+                assert np.isnan(got[key]), (i, key)
+            else:
+                assert got[key] == pytest.approx(expected, nan_ok=True), (i, key)
+
+
+def test_analyze_risk_batch_volatility_bands():
+    strategy = DynamicPositionSizingStrategy()
+    atr_pct = [0.5, 1.0, 2.5, 3.9, 4.0, np.nan]
+    levels = [strategy._get_volatility_level(v) for v in atr_pct]
+    
+    frame = pd.DataFrame({"close": 100.0, "position_size": 0.1, "atr_pct": atr_pct})
+    batch = strategy.analyze_risk_batch(frame)
+    
+    assert batch["volatility_level"].tolist() == levels
+    assert batch["risk_reward_ratio"].tolist() == [0.0] * 6
@@ -0,0 +1,124 @@
+"""Testes do `IndicatorCache`: chave por buffer, resultados somente leitura e limites."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import base_strategy, indicator_cache
+from strategies.indicator_cache import IndicatorCache
+from strategies.macd_crossover import MACDCrossoverStrategy
+from strategies.trend_following import TrendFollowingStrategy
+
+
+def test_repeated_call_hits(ohlcv):
+    cache = IndicatorCache()
+    first = cache.rsi(ohlcv["close"], 14)
+    second = cache.rsi(ohlcv["close"], 14)
+    
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_series_equal(first, second)
+    pd.testing.assert_series_equal(first, base_strategy.calculate_rsi(ohlcv["close"], 14))
+
+
+def test_strategies_share_entries_within_a_scan(ohlcv):
+    cache = IndicatorCache()
+    TrendFollowingStrategy(ctx=cache).run(ohlcv)
+    misses = cache.misses
+    
+    # EMAs e ATR da MACD coincidem com os da trend_following
+    MACDCrossoverStrategy(ctx=cache).run(ohlcv)
+    
+    assert cache.hits >= 2
+    assert cache.misses - misses < 4
+
+
+def test_key_includes_params_and_buffer(ohlcv):
+    cache = IndicatorCache()
+    cache.ema(ohlcv["close"], 9)
+    cache.ema(ohlcv["close"], 21)
+    cache.sma(ohlcv["close"], 9)
+    
+    changed = ohlcv["close"].copy()
+    changed.iloc[-1] += 1.0
+    result = cache.ema(changed, 9)
+    
+    assert (cache.hits, cache.misses) == (0, 4)
+    pd.testing.assert_series_equal(result, base_strategy.calculate_ema(changed, 9))
+
+
+def test_freed_buffer_is_not_aliased():
+    cache = IndicatorCache()
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        series = pd.Series(rng.normal(size=500))
+        np.testing.assert_array_equal(cache.sma(series, 5), base_strategy.calculate_sma(series, 5))
+        del series
+    
+    assert cache.hits == 0
+
+
+def test_results_are_read_only(ohlcv):
+    cache = IndicatorCache()
+    expected = base_strategy.calculate_atr(ohlcv, 14)
+    
+    with pytest.raises(ValueError):
+        cache.atr(ohlcv, 14).to_numpy()[:] = -1.0
+    upper, _, _ = cache.bollinger(ohlcv["close"], 20, 2.0)
+    with pytest.raises(ValueError):
+        upper.to_numpy()[:] = np.nan
+    
+    pd.testing.assert_series_equal(cache.atr(ohlcv, 14), expected)
+
+
+def test_strategy_output_stays_writable(ohlcv):
+    result = TrendFollowingStrategy(ctx=IndicatorCache()).run(ohlcv)
+    
+    result.loc[result.index[-1], "atr"] = 1.0
+    assert result["atr"].iat[-1] == 1.0
+
+
+def test_lru_eviction(ohlcv):
+    cache = IndicatorCache(maxsize=2)
+    close = ohlcv["close"]
+    cache.ema(close, 5)
+    cache.ema(close, 10)
+    cache.ema(close, 5)    # renova o período 5
+    cache.ema(close, 20)   # descarta o período 10
+    
+    cache.ema(close, 5)
+    assert cache.hits == 2
+    cache.ema(close, 10)
+    assert cache.misses == 4
+
+
+def test_byte_budget(ohlcv):
+    entry_bytes = len(ohlcv) * 8
+    cache = IndicatorCache(max_bytes=4 * entry_bytes)
+    cache.ema(ohlcv["close"], 5)
+    cache.bollinger(ohlcv["close"], 20, 2.0)   # 3 linhas: total de 4 entradas
+    assert cache.nbytes == 4 * entry_bytes
+    
+    cache.ema(ohlcv["close"], 10)              # estoura: sai a EMA 5
+    cache.ema(ohlcv["close"], 5)
+    
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.misses == 4
+
+
+def test_clear_resets_entries_and_counters(ohlcv):
+    cache = IndicatorCache()
+    cache.volume_sma(ohlcv["volume"], 20)
+    cache.volume_sma(ohlcv["volume"], 20)
+    cache.clear()
+    
+    assert (cache.hits, cache.misses, cache.nbytes) == (0, 0, 0)
+    cache.volume_sma(ohlcv["volume"], 20)
+    assert cache.misses == 1
+
+
+def test_strategies_without_ctx_are_uncached(ohlcv):
+    strategy = TrendFollowingStrategy()
+    strategy.run(ohlcv)
+    
+    assert strategy.ctx is indicator_cache.uncached
+    assert (strategy.ctx.hits, strategy.ctx.misses, len(strategy.ctx._entries)) == (0, 0, 0)
@@ -0,0 +1,253 @@
+"""
+Paridade dos kernels de `strategies._indicators` com as expressões pandas
+que eles substituem, nos caminhos Numba e NumPy/pandas (fixture `engine`).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import _indicators, _numba, base_strategy
+
+from conftest import with_gaps
+
+RTOL = 1e-9
+
+
+@pytest.fixture(params=[False, True], ids=["contiguous", "nan-gap"])
+def close(request, ohlcv) -> np.ndarray:
+    values = ohlcv["close"].to_numpy()
+    return with_gaps(values) if request.param else values
+
+
+def _true_range_ref(df: pd.DataFrame) -> np.ndarray:
+    prev_close = df["close"].shift(1)
+    return pd.concat([
+        df["high"] - df["low"],
+        (df["high"] - prev_close).abs(),
+        (df["low"] - prev_close).abs(),
+    ], axis=1).max(axis=1).to_numpy()
+
+
+@pytest.mark.parametrize("gaps", [False, True], ids=["contiguous", "nan-gap"])
+def test_true_range_matches_concat_max(ohlcv, engine, gaps):
+    df = ohlcv.assign(close=with_gaps(ohlcv["close"].to_numpy())) if gaps else ohlcv
+    high, low, close = (df[c].to_numpy() for c in ("high", "low", "close"))
+    
+    np.testing.assert_allclose(_indicators.true_range(high, low, close), _true_range_ref(df), rtol=RTOL)
+
+
+def test_true_range_writes_into_out(ohlcv, engine):
+    high, low, close = (ohlcv[c].to_numpy() for c in ("high", "low", "close"))
+    out = np.empty(len(close))
+    
+    result = _indicators.true_range(high, low, close, out=out)
+    
+    assert result is out
+    np.testing.assert_allclose(out, _true_range_ref(ohlcv), rtol=RTOL)
+
+
+@pytest.mark.parametrize("window", [1, 5, 20])
+def test_rolling_extremes_match_pandas(close, engine, window):
+    series = pd.Series(close)
+    np.testing.assert_array_equal(_indicators.rolling_max(close, window), series.rolling(window).max())
+    np.testing.assert_array_equal(_indicators.rolling_min(close, window), series.rolling(window).min())
+
+
+@pytest.mark.parametrize("window", [1, 5, 20])
+def test_rolling_extremes_bottleneck_path(close, monkeypatch, window):
+    if not _indicators.BOTTLENECK_AVAILABLE:
+        pytest.skip("bottleneck não instalado")
+    monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+    
+    series = pd.Series(close)
+    np.testing.assert_array_equal(_indicators.rolling_max(close, window), series.rolling(window).max())
+    np.testing.assert_array_equal(_indicators.rolling_min(close, window), series.rolling(window).min())
+
+
+def test_rolling_extremes_window_longer_than_series(engine):
+    values = np.arange(5.0)
+    
+    assert np.isnan(_indicators.rolling_max(values, 10)).all()
+    assert np.isnan(_indicators.rolling_min(values, 10)).all()
+
+
+def test_crossings_match_shift():
+    fast = pd.Series([1.0, 2.0, 3.0, np.nan, 5.0, 1.0, 4.0, 2.0])
+    slow = pd.Series([2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0])
+    above = (fast > slow) & (fast.shift(1) <= slow.shift(1))
+    below = (fast < slow) & (fast.shift(1) >= slow.shift(1))
+    
+    np.testing.assert_array_equal(_indicators.crossed_above(fast.to_numpy(), slow.to_numpy()), above)
+    np.testing.assert_array_equal(_indicators.crossed_below(fast.to_numpy(), slow.to_numpy()), below)
+
+
+@pytest.mark.parametrize("window", [1, 5, 20])
+def test_rolling_mean_std_match_pandas(close, engine, window):
+    series = pd.Series(close)
+    np.testing.assert_allclose(_indicators.rolling_mean(close, window), series.rolling(window).mean(), rtol=RTOL)
+    np.testing.assert_allclose(_indicators.rolling_std(close, window), series.rolling(window).std(), rtol=RTOL)
+
+
+def test_rolling_mean_std_flat_window_has_no_residue(engine):
+    values = np.r_[np.linspace(90.0, 110.0, 50), np.full(30, 100.1)]
+    
+    assert _indicators.rolling_std(values, 20)[-1] == 0.0
+    assert _indicators.rolling_mean(values, 20)[-1] == pytest.approx(100.1, rel=1e-15)
+
+
+def test_bollinger_matches_pandas(close, engine):
+    series = pd.Series(close)
+    middle = series.rolling(20).mean()
+    std = series.rolling(20).std()
+    
+    upper, mid, lower = _indicators.bollinger(close, 20, 2.0)
+    
+    np.testing.assert_allclose(mid, middle, rtol=RTOL)
+    np.testing.assert_allclose(upper, middle + 2.0 * std, rtol=RTOL)
+    np.testing.assert_allclose(lower, middle - 2.0 * std, rtol=RTOL)
+
+
+@pytest.mark.parametrize("period", [9, 21])
+def test_ema_matches_pandas(close, engine, period):
+    expected = pd.Series(close).ewm(span=period, adjust=False).mean()
+    np.testing.assert_allclose(_indicators.ema(close, period), expected, rtol=RTOL)
+
+
+def test_macd_matches_pandas(close, engine):
+    series = pd.Series(close)
+    macd_line = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+    
+    for got, expected in zip(_indicators.macd(close, 12, 26, 9),
+                             (macd_line, signal_line, macd_line - signal_line)):
+        np.testing.assert_allclose(got, expected, rtol=1e-7, atol=1e-12)
+
+
+
+def test_max_drawdown_matches_cumprod(ohlcv, engine):
+    returns = ohlcv["close"].pct_change().to_numpy()
+    cumulative = (1 + pd.Series(returns).fillna(0)).cumprod()
+    running_max = cumulative.cummax()
+    expected = ((cumulative - running_max) / running_max).min()
+    
+    assert _indicators.max_drawdown(returns) == pytest.approx(expected, rel=RTOL)
+
+
+def test_max_drawdown_edge_cases(engine):
+    assert _indicators.max_drawdown(np.array([])) == 0.0
+    assert _indicators.max_drawdown(np.array([0.01, 0.02, np.nan])) == 0.0
+    assert _indicators.max_drawdown(np.array([0.5, -0.5, 0.1])) == pytest.approx(-0.5)
+
+
+def _all_indicators(df: pd.DataFrame) -> dict:
+    high, low, close = (df[c].to_numpy() for c in ("high", "low", "close"))
+    gapped = with_gaps(close)
+    upper, middle, lower = _indicators.bollinger(gapped, 20, 2.0)
+    macd_line, signal_line, hist = _indicators.macd(gapped, 12, 26, 9)
+    return {
+        "true_range": _indicators.true_range(high, low, gapped),
+        "rolling_mean": _indicators.rolling_mean(gapped, 20),
+        "rolling_std": _indicators.rolling_std(gapped, 20),
+        "rolling_max": _indicators.rolling_max(gapped, 20),
+        "rolling_min": _indicators.rolling_min(gapped, 20),
+        "bb_upper": upper, "bb_middle": middle, "bb_lower": lower,
+        "ema": _indicators.ema(gapped, 21),
+        "macd": macd_line, "macd_signal": signal_line, "macd_hist": hist,
+        "wilder": _indicators.wilder(gapped, 14),
+        "rsi": _indicators.rsi(gapped, 14),
+        "atr": _indicators.atr(high, low, close, 14),
+        "volume_sma": _indicators.volume_sma(with_gaps(df["volume"].to_numpy()), 20),
+        "max_drawdown": np.array([_indicators.max_drawdown(np.diff(close) / close[:-1])]),
+    }
+
+
+def test_numba_kernels_match_fallback(ohlcv, monkeypatch):
+    if not _numba.NUMBA_AVAILABLE:
+        pytest.skip("numba não instalado")
+    
+    compiled = _all_indicators(ohlcv)
+    monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+    monkeypatch.setattr(_indicators, "BOTTLENECK_AVAILABLE", False)
+    fallback = _all_indicators(ohlcv)
+    
+    for name, values in compiled.items():
+        np.testing.assert_allclose(values, fallback[name], rtol=RTOL, atol=1e-12, err_msg=name)
+
+
+def _wilder_ref(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(values).ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean().to_numpy()
+
+
+def _rsi_ref(close: np.ndarray, period: int) -> np.ndarray:
+    delta = pd.Series(close).diff()
+    gain = _wilder_ref(delta.clip(lower=0).to_numpy(), period)
+    loss = _wilder_ref((-delta).clip(lower=0).to_numpy(), period)
+    return 100 - 100 / (1 + gain / loss)
+
+
+@pytest.mark.parametrize("period", [7, 14])
+def test_wilder_and_rsi_match_ewm(close, engine, period):
+    np.testing.assert_allclose(_indicators.wilder(close, period), _wilder_ref(close, period), rtol=RTOL)
+    np.testing.assert_allclose(_indicators.rsi(close, period), _rsi_ref(close, period), rtol=RTOL)
+
+
+def test_atr_is_wilder_smoothed_true_range(ohlcv, engine):
+    high, low, close = (ohlcv[c].to_numpy() for c in ("high", "low", "close"))
+    
+    expected = _wilder_ref(_true_range_ref(ohlcv), 14)
+    np.testing.assert_allclose(_indicators.atr(high, low, close, 14), expected, rtol=RTOL)
+
+
+def test_rsi_edge_cases(engine):
+    rising = np.arange(1.0, 40.0)
+    flat = np.full(40, 10.0)
+    
+    assert _indicators.rsi(rising, 14)[-1] == 100.0
+    assert np.isnan(_indicators.rsi(flat, 14)[14:]).all()
+    assert np.isnan(_indicators.rsi(rising, 14)[:14]).all()
+
+
+def test_calculate_rsi_atr_use_wilder_not_sma(ohlcv):
+    close = ohlcv["close"]
+    delta = close.diff()
+    sma_rsi = 100 - 100 / (1 + delta.clip(lower=0).rolling(14).mean() / (-delta).clip(lower=0).rolling(14).mean())
+    
+    rsi = base_strategy.calculate_rsi(close, 14)
+    atr = base_strategy.calculate_atr(ohlcv, 14)
+    
+    np.testing.assert_allclose(rsi, _rsi_ref(close.to_numpy(), 14), rtol=RTOL)
+    np.testing.assert_allclose(atr, _wilder_ref(_true_range_ref(ohlcv), 14), rtol=RTOL)
+    assert not np.allclose(rsi.iloc[14:], sma_rsi.iloc[14:])
+
+
+def test_volume_sma_int_is_exact(ohlcv, engine):
+    volume = ohlcv["volume"].to_numpy()
+    np.testing.assert_array_equal(_indicators.volume_sma(volume, 20), pd.Series(volume).rolling(20).mean())
+
+
+def test_volume_sma_large_int_does_not_overflow(engine):
+    volume = np.full(100, 2**40, dtype=np.int64)
+    np.testing.assert_array_equal(_indicators.volume_sma(volume, 20)[19:], float(2**40))
+
+
+def test_volume_sma_float_with_nan(ohlcv, engine):
+    volume = with_gaps(ohlcv["volume"].to_numpy())
+    np.testing.assert_allclose(_indicators.volume_sma(volume, 20), pd.Series(volume).rolling(20).mean(), rtol=RTOL)
+
+
+def test_volume_sma_bottleneck_path(ohlcv, monkeypatch):
+    if not _indicators.BOTTLENECK_AVAILABLE:
+        pytest.skip("bottleneck não instalado")
+    monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+    volume = with_gaps(ohlcv["volume"].to_numpy())
+    
+    np.testing.assert_allclose(_indicators.volume_sma(volume, 20), pd.Series(volume).rolling(20).mean(), rtol=RTOL)
+
+
+def test_macd_from_emas_matches_macd(close, engine):
+    expected = _indicators.macd(close, 12, 26, 9)
+    got = _indicators.macd_from_emas(_indicators.ema(close, 12), _indicators.ema(close, 26), 9)
+    
+    for a, b in zip(got, expected):
+        np.testing.assert_allclose(a, b, rtol=1e-12, atol=1e-14)
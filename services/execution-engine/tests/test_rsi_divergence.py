@@ -0,0 +1,55 @@
+"""Testes da `RSIDivergenceStrategy`: kernel Numba da varredura vs caminho NumPy."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import _numba
+from strategies.base_strategy import calculate_macd
+from strategies.rsi_divergence import RSIDivergenceStrategy
+
+from conftest import make_ohlcv
+
+
+def _oscillating(n: int, seed: int) -> pd.DataFrame:
+    """Candles em ondas, com picos e vales que geram divergências."""
+    df = make_ohlcv(n, seed)
+    t = np.arange(n)
+    rng = np.random.default_rng(seed)
+    close = 100 + 8 * np.sin(2 * np.pi * t / 30) * (1 + 0.5 * np.sin(2 * np.pi * t / 170)) + rng.normal(0, 0.5, n)
+    return df.assign(
+        open=np.r_[close[0], close[:-1]],
+        high=close * (1 + np.abs(rng.normal(0, 0.01, n))),
+        low=close * (1 - np.abs(rng.normal(0, 0.01, n))),
+        close=close,
+    )
+
+
+@pytest.mark.parametrize("params", [
+    {"min_adx": 5},
+    {"min_adx": 0, "min_signal_strength": 0.0},
+    {"min_adx": 0, "min_signal_strength": 0.0, "lookback_periods": 3},
+])
+@pytest.mark.parametrize("gaps", [False, True], ids=["contiguous", "nan-gap"])
+def test_divergence_scan_numba_matches_numpy(monkeypatch, params, gaps):
+    if not _numba.NUMBA_AVAILABLE:
+        pytest.skip("numba não instalado")
+    df = _oscillating(1500, 4)
+    if gaps:
+        df.loc[100:102, ["open", "high", "low", "close", "volume"]] = np.nan
+    
+    compiled = RSIDivergenceStrategy(params).run(df)
+    monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+    fallback = RSIDivergenceStrategy(params).run(df)
+    
+    assert (compiled["signal"] != "HOLD").sum() > 0
+    pd.testing.assert_frame_equal(compiled, fallback, check_exact=False, rtol=1e-12)
+
+
+def test_macd_columns_match_calculate_macd(ohlcv):
+    result = RSIDivergenceStrategy().run(ohlcv)
+    macd_line, signal_line, histogram = calculate_macd(ohlcv["close"], 12, 26, 9)
+    
+    np.testing.assert_allclose(result["macd"], macd_line, rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(result["macd_signal"], signal_line, rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(result["macd_hist"], histogram, rtol=1e-12, atol=1e-14)
@@ -0,0 +1,49 @@
+"""Testes de comportamento comuns às estratégias do `StrategyManager`."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import _indicators, _numba
+from strategies.base_strategy import MIN_DATA_ROWS
+from strategies.strategy_manager import StrategyManager
+
+from conftest import make_ohlcv
+
+
+@pytest.mark.parametrize("name", list(StrategyManager.STRATEGIES))
+def test_derived_ratio_columns_are_float64(ohlcv, name):
+    result = StrategyManager.get_strategy(name).run(ohlcv)
+    
+    for column in ("volume_ratio", "bb_pct", "dist_resistance", "dist_support"):
+        if column in result.columns:
+            assert result[column].dtype == np.float64, column
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("name", list(StrategyManager.STRATEGIES))
+def test_realtime_window_reproduces_last_signal(name, seed):
+    df = make_ohlcv(1500, seed)
+    strategy = StrategyManager.get_strategy_class(name)()
+    window = df.iloc[-max(strategy.min_required_bars, MIN_DATA_ROWS):]
+    
+    full = strategy.get_current_signal(df)
+    realtime = strategy.get_current_signal(window)
+    
+    assert (realtime.signal_type, realtime.timestamp, realtime.price) == (full.signal_type, full.timestamp, full.price)
+    assert realtime.indicators.keys() == full.indicators.keys()
+    for key, value in full.indicators.items():
+        assert realtime.indicators[key] == pytest.approx(value, rel=1e-3, abs=1e-9), key
+
+
+@pytest.mark.parametrize("name", list(StrategyManager.STRATEGIES))
+def test_numba_output_matches_fallback(ohlcv, monkeypatch, name):
+    if not _numba.NUMBA_AVAILABLE:
+        pytest.skip("numba não instalado")
+    
+    compiled = StrategyManager.get_strategy_class(name)().run(ohlcv)
+    monkeypatch.setattr(_numba, "NUMBA_AVAILABLE", False)
+    monkeypatch.setattr(_indicators, "BOTTLENECK_AVAILABLE", False)
+    fallback = StrategyManager.get_strategy_class(name)().run(ohlcv)
+    
+    pd.testing.assert_frame_equal(compiled, fallback, check_exact=False, rtol=1e-9)
@@ -0,0 +1,119 @@
+"""Testes do `StrategyManager` e da detecção de regime de mercado."""
+
+import numpy as np
+import pytest
+
+from strategies import strategy_manager
+from strategies.base_strategy import MIN_DATA_ROWS, fingerprint
+from strategies.strategy_manager import StrategyManager
+from strategies.trend_following import TrendFollowingStrategy
+
+
+@pytest.fixture
+def classify_calls(monkeypatch):
+    """Conta as classificações de regime efetivamente calculadas."""
+    calls = []
+    classify = strategy_manager._classify_regime
+    
+    def counting(df):
+        calls.append(len(df))
+        return classify(df)
+    
+    monkeypatch.setattr(strategy_manager, "_classify_regime", counting)
+    monkeypatch.setattr(strategy_manager, "_REGIME_CACHE", type(strategy_manager._REGIME_CACHE)())
+    return calls
+
+
+def test_fingerprint_tracks_content_and_dtype():
+    values = np.linspace(1.0, 2.0, 100)
+    changed = values.copy()
+    changed[50] += 1e-12
+    
+    assert fingerprint(values) == fingerprint(values.copy())
+    assert fingerprint(values) != fingerprint(changed)
+    assert fingerprint(values) != fingerprint(values.astype(np.float32))
+    assert fingerprint(values[::2]) == fingerprint(np.ascontiguousarray(values[::2]))
+
+
+def test_regime_memo_hits_on_same_tail(ohlcv, classify_calls):
+    regime = strategy_manager.detect_market_regime(ohlcv)
+    
+    assert strategy_manager.detect_market_regime(ohlcv.copy()) == regime
+    assert classify_calls == [strategy_manager._REGIME_BARS]
+
+
+def test_regime_memo_misses_on_changed_candle(ohlcv, classify_calls):
+    strategy_manager.detect_market_regime(ohlcv)
+    
+    changed = ohlcv.copy()
+    changed.loc[changed.index[-60], "close"] *= 1.01
+    strategy_manager.detect_market_regime(changed)
+    
+    # Candles fora da cauda classificada não mudam a chave
+    older = ohlcv.copy()
+    older.loc[older.index[0], "close"] *= 1.01
+    strategy_manager.detect_market_regime(older)
+    
+    assert len(classify_calls) == 2
+
+
+def _records(df):
+    records = df.to_dict("records")
+    for record in records:
+        record["time"] = record["time"].isoformat()
+    return records
+
+
+@pytest.fixture
+def captured_frames(monkeypatch):
+    """DataFrames que `generate_signal` entrega à estratégia."""
+    frames = []
+    original = TrendFollowingStrategy.get_current_signal
+    
+    def capture(self, df, run=True):
+        if run:
+            frames.append(df)
+        return original(self, df, run)
+    
+    monkeypatch.setattr(TrendFollowingStrategy, "get_current_signal", capture)
+    return frames
+
+
+@pytest.mark.parametrize("scale, dtype", [(1, np.int32), (10**6, np.int64)])
+def test_generate_signal_volume_dtype(ohlcv, captured_frames, scale, dtype):
+    df = ohlcv.assign(volume=ohlcv["volume"] * scale)
+    
+    StrategyManager()._generate_signal_sync("trend_following", _records(df))
+    
+    volume = captured_frames[-1]["volume"]
+    assert volume.dtype == dtype
+    np.testing.assert_array_equal(volume.to_numpy(), df["volume"].to_numpy())
+
+
+def test_realtime_signal_uses_only_the_required_tail(ohlcv, captured_frames):
+    strategy = StrategyManager.get_strategy("trend_following")
+    
+    result = StrategyManager()._generate_signal_sync("trend_following", _records(ohlcv), realtime=True)
+    
+    window = captured_frames[-1]
+    assert len(window) == max(strategy.min_required_bars, MIN_DATA_ROWS) < len(ohlcv)
+    assert window.index[-1] == ohlcv.index[-1]
+    assert result["price"] == ohlcv["close"].iat[-1]
+
+
+def test_parallel_compare_matches_serial(ohlcv):
+    names = list(StrategyManager.STRATEGIES)
+    
+    parallel = StrategyManager.compare_strategies(names, ohlcv)
+    serial = {name: StrategyManager.compare_strategies([name], ohlcv)[name] for name in names}
+    
+    assert {name: parallel[name] for name in names} == serial
+    assert all(result["status"] == "success" for result in serial.values())
+    assert set(parallel["_ranking"].values()) <= set(names)
+
+
+def test_parallel_compare_isolates_failures(ohlcv):
+    results = StrategyManager.compare_strategies(["trend_following", "unknown", "breakout"], ohlcv)
+    
+    assert results["unknown"]["status"] == "error"
+    assert results["trend_following"]["status"] == results["breakout"]["status"] == "success"